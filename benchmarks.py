@@ -0,0 +1,382 @@
+"""
+Performance Benchmarks for the Blacklist Management Tool
+Run with: python benchmarks.py <benchmark> [options]
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import threading
+import time
+
+from blacklist import BlacklistManager
+
+
+def _random_word(rng: random.Random, min_len: int = 4, max_len: int = 10) -> str:
+    """Generate a random lowercase word."""
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def _make_manager(directory: str, entries: int, seed: int = 0, **options) -> BlacklistManager:
+    """
+    Create a manager populated with synthetic entries in a single save.
+    
+    Args:
+        directory: Directory for the data file
+        entries: Number of entries to add
+        seed: Random seed for the generated names
+        **options: Extra BlacklistManager arguments
+    """
+    rng = random.Random(seed)
+    manager = BlacklistManager(os.path.join(directory, "blacklist.json"), **options)
+    threat_levels = ["Low", "Medium", "High", "Critical"]
+    categories = ["General", "Fraud", "Spam", "Malware", "Abuse"]
+    manager.add_entries([
+        {
+            "name": f"{_random_word(rng)} {_random_word(rng)}",
+            "reason": " ".join(_random_word(rng) for _ in range(5)),
+            "threat_level": rng.choice(threat_levels),
+            "category": rng.choice(categories),
+        }
+        for _ in range(entries)
+    ])
+    return manager
+
+
+def bench_scanner(entries: int, megabytes: float, chunk_size: int):
+    """Measure BlacklistScanner throughput in MB/s."""
+    from scanner import BlacklistScanner
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _make_manager(tmp, entries)
+        names = [entry["name"] for entry in manager.blacklist["entries"]]
+
+        words = []
+        size = 0
+        target = int(megabytes * 1024 * 1024)
+        while size < target:
+            word = rng.choice(names) if rng.random() < 0.01 else _random_word(rng)
+            words.append(word)
+            size += len(word) + 1
+        text = " ".join(words)
+
+        scanner = BlacklistScanner(manager)
+        start = time.perf_counter()
+        scanner.rebuild()
+        build_time = time.perf_counter() - start
+
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        start = time.perf_counter()
+        matches = sum(1 for _ in scanner.scan_stream(chunks))
+        scan_time = time.perf_counter() - start
+
+        mb = len(text.encode("utf-8")) / (1024 * 1024)
+        print(f"patterns:   {entries}")
+        print(f"build:      {build_time:.3f}s")
+        print(f"text:       {mb:.2f} MB in {len(chunks)} chunks")
+        print(f"matches:    {matches}")
+        print(f"scan:       {scan_time:.3f}s ({mb / scan_time:.2f} MB/s)")
+
+
+def bench_network(entries: int, lookups: int):
+    """Measure match_ips/match_domains lookup rate."""
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _make_manager(tmp, 0)
+        records = []
+        for _ in range(entries):
+            prefix = rng.randint(8, 32)
+            address = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}"
+            records.append({"name": f"{address}/{prefix}", "reason": "benchmark", "entry_type": "cidr"})
+            domain = f"{_random_word(rng)}.{rng.choice(['com', 'net', 'org'])}"
+            if rng.random() < 0.5:
+                domain = "*." + domain
+            records.append({
+                "name": domain, "reason": "benchmark",
+                "entry_type": "wildcard_domain" if domain.startswith("*.") else "domain",
+            })
+        manager.add_entries(records)
+
+        start = time.perf_counter()
+        manager.match_ip("0.0.0.0")
+        build_time = time.perf_counter() - start
+
+        ips = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}"
+               for _ in range(lookups)]
+        domains = [f"www.{_random_word(rng)}.com" for _ in range(lookups)]
+
+        start = time.perf_counter()
+        ip_hits = sum(1 for match in manager.match_ips(ips) if match)
+        ip_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        domain_hits = sum(1 for match in manager.match_domains(domains) if match)
+        domain_time = time.perf_counter() - start
+
+        print(f"entries:    {2 * entries}")
+        print(f"build:      {build_time:.3f}s")
+        print(f"ip:         {lookups / ip_time:,.0f} lookups/s ({ip_hits} hits)")
+        print(f"domain:     {lookups / domain_time:,.0f} lookups/s ({domain_hits} hits)")
+
+
+def bench_concurrency(entries: int, duration: float, max_threads: int):
+    """
+    Stress readers against a concurrent writer and measure read throughput.
+    
+    Every read checks that its snapshot is internally consistent (unique IDs,
+    complete entries, expected size), so this doubles as a stress test.
+    """
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _make_manager(tmp, entries, write_back=True, flush_delay=0.5, flush_after=10 ** 9)
+
+        thread_counts = []
+        count = 1
+        while count <= max_threads:
+            thread_counts.append(count)
+            count *= 2
+
+        for readers in thread_counts:
+            stop = threading.Event()
+            reads = [0] * readers
+            writes = [0]
+            errors = []
+
+            def writer():
+                while not stop.is_set():
+                    entry = manager.add_entry(_random_word(rng), "stress", rng.choice(["Low", "High"]))
+                    manager.update_entry(entry["id"], notes="updated", threat_level="Critical")
+                    manager.remove_entry(entry["id"])
+                    writes[0] += 3
+
+            def reader(slot):
+                try:
+                    while not stop.is_set():
+                        snapshot = manager.blacklist["entries"]
+                        ids = [entry["id"] for entry in snapshot]
+                        if len(ids) != len(set(ids)) or len(ids) not in (entries, entries + 1):
+                            raise AssertionError(f"inconsistent snapshot of {len(ids)} entries")
+                        manager.search_entries("zz")
+                        reads[slot] += 1
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+
+            threads = [threading.Thread(target=writer)]
+            threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            time.sleep(duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            status = f"FAILED: {errors[0]}" if errors else "ok"
+            print(f"readers={readers:<3} reads/s={sum(reads) / elapsed:>10,.0f}  "
+                  f"writes/s={writes[0] / elapsed:>8,.0f}  {status}")
+            if errors:
+                raise SystemExit(1)
+
+        manager.close()
+
+
+def bench_live_search(entries: int, queries: int):
+    """Measure index build time and per-keystroke latency of LiveSearch."""
+    from live_search import LiveSearch
+
+    rng = random.Random(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _make_manager(tmp, entries)
+        names = [entry["name"] for entry in manager.blacklist["entries"]]
+        search = LiveSearch(manager, limit=10)
+
+        start = time.perf_counter()
+        search.prepare()
+        build_time = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(queries):
+            name = rng.choice(names)
+            # Type the name one character at a time, as a user would
+            for length in range(1, min(len(name), 8) + 1):
+                start = time.perf_counter()
+                search.suggest(name[:length])
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        print(f"entries:    {entries}")
+        print(f"build:      {build_time:.3f}s")
+        print(f"keystrokes: {len(latencies)}")
+        print(f"p50:        {latencies[len(latencies) // 2] * 1000:.3f} ms")
+        print(f"p99:        {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+        print(f"max:        {latencies[-1] * 1000:.3f} ms")
+
+
+def bench_top_entries(entries: int, k: int):
+    """Compare top_entries against a full composite sort plus slice."""
+    import storage
+    from blacklist import THREAT_ORDER
+
+    rng = random.Random(6)
+    with tempfile.TemporaryDirectory() as tmp:
+        # add_entries stamps date_added in insertion order, which would hand
+        # the full sort presorted input; load spread-out historical dates instead
+        data_file = os.path.join(tmp, "blacklist.json")
+        storage.write_file(data_file, {"entries": [
+            {
+                "id": f"BL{i + 1:03d}",
+                "name": f"{_random_word(rng)} {_random_word(rng)}",
+                "reason": "benchmark",
+                "threat_level": rng.choice(["Low", "Medium", "High", "Critical"]),
+                "category": "General",
+                "date_added": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T"
+                              f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                "status": "active",
+            }
+            for i in range(entries)
+        ], "metadata": {"version": "1.0"}})
+        manager = BlacklistManager(data_file)
+
+        start = time.perf_counter()
+        ranked = sorted(manager.blacklist["entries"], key=lambda e: e["date_added"], reverse=True)
+        ranked.sort(key=lambda e: THREAT_ORDER.get(e["threat_level"], 2))
+        expected = ranked[:k]
+        sort_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        top = manager.top_entries(k, rank_by=("threat_level", "date_added"))
+        top_time = time.perf_counter() - start
+
+        same = [(e["threat_level"], e["date_added"]) for e in top] == \
+               [(e["threat_level"], e["date_added"]) for e in expected]
+        print(f"entries:    {entries}, k={k}")
+        print(f"full sort:  {sort_time * 1000:.1f} ms")
+        print(f"top:        {top_time * 1000:.1f} ms ({'same ranking' if same else 'MISMATCH'})")
+
+
+def bench_versions(entries: int, changes: int):
+    """Measure the cost of recording versions against copying the full entry list."""
+    import copy
+    from versioning import VersionStore
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _make_manager(tmp, entries)
+        current = manager.blacklist["entries"]
+
+        start = time.perf_counter()
+        store = VersionStore(current, os.path.join(tmp, "history"), limit=changes + 1)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(changes):
+            old = current[rng.randrange(entries)]
+            store.commit([(old, dict(old, notes=f"change {i}"))])
+        commit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        diff = store.diff(store.version - changes, store.version)
+        diff_time = time.perf_counter() - start
+
+        copies = min(changes, 5)
+        start = time.perf_counter()
+        for _ in range(copies):
+            copy.deepcopy(current)
+        copy_time = (time.perf_counter() - start) / copies
+
+        print(f"entries:    {entries}")
+        print(f"build:      {build_time:.3f}s")
+        print(f"version:    {commit_time / changes * 1e6:.1f} us per single-entry change")
+        print(f"full copy:  {copy_time * 1e6:.1f} us per snapshot")
+        print(f"diff:       {len(diff)} changes across {changes} versions in {diff_time * 1000:.1f} ms")
+
+
+def bench_storage(sizes: list, formats: list):
+    """Compare bytes on disk, save time and load time of each storage format."""
+    import storage
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for entries in sizes:
+            manager = _make_manager(tmp, entries)
+            path = os.path.join(tmp, "encoded")
+            print(f"entries: {entries}")
+            print(f"  {'format':<16}{'bytes':>14}{'ratio':>8}{'save':>10}{'load':>10}")
+            baseline = None
+            for storage_format in formats:
+                start = time.perf_counter()
+                storage.write_file(path, manager.blacklist, storage_format)
+                save_time = time.perf_counter() - start
+                size = os.path.getsize(path)
+
+                start = time.perf_counter()
+                data, detected = storage.read_file(path)
+                load_time = time.perf_counter() - start
+                assert detected == storage_format and len(data["entries"]) == entries
+
+                baseline = baseline or size
+                print(f"  {storage_format:<16}{size:>14,}{size / baseline:>8.2f}"
+                      f"{save_time:>9.2f}s{load_time:>9.2f}s")
+
+
+def main():
+    """Parse arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description="Blacklist performance benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    scan_parser = subparsers.add_parser("scanner", help="Text scanner throughput")
+    scan_parser.add_argument("--entries", type=int, default=10000)
+    scan_parser.add_argument("--megabytes", type=float, default=5.0)
+    scan_parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+
+    network_parser = subparsers.add_parser("network", help="IP/domain match rate")
+    network_parser.add_argument("--entries", type=int, default=50000)
+    network_parser.add_argument("--lookups", type=int, default=200000)
+
+    concurrency_parser = subparsers.add_parser("concurrency", help="Threaded read/write stress test")
+    concurrency_parser.add_argument("--entries", type=int, default=10000)
+    concurrency_parser.add_argument("--duration", type=float, default=2.0)
+    concurrency_parser.add_argument("--max-threads", type=int, default=8)
+
+    live_parser = subparsers.add_parser("live-search", help="Search-as-you-type latency")
+    live_parser.add_argument("--entries", type=int, default=1000000)
+    live_parser.add_argument("--queries", type=int, default=500)
+
+    top_parser = subparsers.add_parser("top", help="Top-k selection vs full sort")
+    top_parser.add_argument("--entries", type=int, default=1000000)
+    top_parser.add_argument("-k", type=int, default=20)
+
+    versions_parser = subparsers.add_parser("versions", help="Version history cost")
+    versions_parser.add_argument("--entries", type=int, default=100000)
+    versions_parser.add_argument("--changes", type=int, default=1000)
+
+    storage_parser = subparsers.add_parser("storage", help="At-rest encoding size and speed")
+    storage_parser.add_argument("--entries", type=int, nargs="+", default=[100000, 1000000])
+    storage_parser.add_argument("--formats", nargs="+",
+                                default=["pretty", "compact", "columnar",
+                                         "compact+gzip", "columnar+gzip",
+                                         "compact+lzma", "columnar+lzma"])
+
+    args = parser.parse_args()
+
+    if args.benchmark == "scanner":
+        bench_scanner(args.entries, args.megabytes, args.chunk_size)
+    elif args.benchmark == "network":
+        bench_network(args.entries, args.lookups)
+    elif args.benchmark == "concurrency":
+        bench_concurrency(args.entries, args.duration, args.max_threads)
+    elif args.benchmark == "live-search":
+        bench_live_search(args.entries, args.queries)
+    elif args.benchmark == "top":
+        bench_top_entries(args.entries, args.k)
+    elif args.benchmark == "versions":
+        bench_versions(args.entries, args.changes)
+    elif args.benchmark == "storage":
+        bench_storage(args.entries, args.formats)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,124 @@
 Core Blacklist Management Logic
 Handles data persistence and basic CRUD operations for the blacklist.
 """
-import json
+import atexit
+import functools
+import heapq
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 from pathlib import Path
 
+import storage
+from network_index import NetworkIndex, normalize_network_value
+from versioning import VersionStore
+
+
+# Sort rank of each threat level, most severe first
+THREAT_ORDER = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+
+# Default composite ranking for top_entries: severity, then recency, then category
+DEFAULT_RANKING = ("threat_level", "date_added", "category")
+
+# Managers with deferred writes, flushed once more at interpreter exit
+_write_back_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_write_back_managers():
+    """Flush pending changes of every write-back manager still alive."""
+    for manager in list(_write_back_managers):
+        manager.close()
+
+
+class _Descending:
+    """Wraps a value so that it sorts in reverse order."""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __lt__(self, other):
+        return other.value < self.value
+    
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _locked(method):
+    """Run a BlacklistManager method while holding its write lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class BlacklistManager:
     """
     Core blacklist manager that handles data persistence and operations.
     Works in conjunction with CrewAI agents for intelligent management.
+    
+    Safe to share between threads. Writers are serialized by a lock and
+    never modify published data in place: each mutation publishes a new
+    `blacklist` dict (copy-on-write), so readers iterate a consistent
+    snapshot without locking. Entries returned by the manager are part of
+    such snapshots and must be treated as read-only.
     """
     
-    def __init__(self, data_file: str = "data/blacklist.json"):
+    def __init__(self, data_file: str = "data/blacklist.json", write_back: bool = False,
+                 flush_delay: float = 1.0, flush_after: int = 100,
+                 versioning: bool = False, history_limit: int = 100,
+                 storage_format: Optional[str] = None):
         """
         Initialize the BlacklistManager.
         
         Args:
             data_file: Path to the JSON file storing blacklist data
+            write_back: Defer saves and coalesce bursts of mutations into one
+                write, done by a background flusher
+            flush_delay: Seconds after the first unsaved change before the
+                background flusher writes (write-back mode)
+            flush_after: Number of unsaved changes that forces an immediate
+                write (write-back mode)
+            versioning: Keep a version history supporting snapshot(), diff()
+                and rollback(); deltas are logged next to the data file
+            history_limit: Number of versions retained in memory and on disk
+            storage_format: At-rest encoding of the data file, a layout
+                ("pretty", "compact" or "columnar") optionally followed by
+                "+gzip" or "+lzma"; None keeps the format of the existing file
         """
+        if storage_format is not None:
+            storage.parse_format(storage_format)
         self.data_file = data_file
+        self.storage_format = storage_format
+        self.write_back = write_back
+        self.flush_delay = flush_delay
+        self.flush_after = flush_after
+        self._lock = threading.RLock()
+        self._dirty = 0
+        self._dirty_since = 0.0
+        self._defer_depth = 0
+        self._flusher = None
+        self._flush_wakeup = threading.Event()
+        self._closed = False
+        self._revision = 0
+        self._network_index = (None, None)
+        self._name_index = (None, None)
+        self._expiry_heap = []
+        self._expiring = {}
         self._ensure_data_file()
         self.blacklist = self._load_data()
+        self._rebuild_expiry_heap()
+        self._versions = None
+        if versioning:
+            self._versions = VersionStore(self.blacklist["entries"],
+                                          self.data_file + ".history", history_limit)
     
     def _ensure_data_file(self):
         """Ensure the data directory and file exist."""
@@ -33,21 +128,154 @@ class BlacklistManager:
             os.makedirs(data_dir)
         
         if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w') as f:
-                json.dump({"entries": [], "metadata": {"version": "1.0"}}, f, indent=2)
+            storage.write_file(self.data_file, {"entries": [], "metadata": {"version": "1.0"}},
+                               self.storage_format or storage.DEFAULT_FORMAT)
     
     def _load_data(self) -> Dict:
-        """Load blacklist data from file."""
+        """Load blacklist data from file, detecting its storage format."""
         try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {"entries": [], "metadata": {"version": "1.0"}}
+            data, detected = storage.read_file(self.data_file)
+        except (ValueError, FileNotFoundError):
+            data, detected = {"entries": [], "metadata": {"version": "1.0"}}, storage.DEFAULT_FORMAT
+        if self.storage_format is None:
+            self.storage_format = detected
+        return data
     
     def _save_data(self):
-        """Save blacklist data to file."""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.blacklist, f, indent=2)
+        """Save blacklist data to file in the configured storage format."""
+        storage.write_file(self.data_file, self.blacklist, self.storage_format)
+        # Only after the data is saved, so the log never gets ahead of it
+        if self._versions is not None:
+            self._versions.flush_log()
+    
+    def _publish(self, entries: List[Dict], changes: Iterable = (), label: str = "",
+                 automatic: bool = False):
+        """
+        Publish a new state with the given entries; the write lock must be held.
+        
+        Args:
+            entries: The complete new entries list
+            changes: (old entry or None, new entry or None) pairs, recorded as
+                a new version when versioning is enabled
+            label: Description of the version
+            automatic: Not a user change (e.g. lazy expiry); undo skips it
+        """
+        state = dict(self.blacklist)
+        state["entries"] = entries
+        # A single reference assignment, so readers see the old or new state
+        self.blacklist = state
+        if self._versions is not None:
+            self._versions.commit(changes, label=label, automatic=automatic)
+    
+    def _mark_changed(self):
+        """Record a mutation and persist it, immediately or via write-back."""
+        self._revision += 1
+        # A closed manager has no flusher left, so it saves synchronously
+        if (not self.write_back or self._closed) and not self._defer_depth:
+            self._save_data()
+            return
+        
+        self._dirty += 1
+        if self._dirty == 1:
+            self._dirty_since = time.monotonic()
+        if not self.write_back:
+            return
+        if self._dirty >= self.flush_after:
+            self.flush()
+        else:
+            self._start_flusher()
+            self._flush_wakeup.set()
+    
+    def _start_flusher(self):
+        """Start the background flusher thread if it is not running."""
+        if self._flusher is None and not self._closed:
+            _write_back_managers.add(self)
+            self._flusher = threading.Thread(target=self._flush_loop,
+                                             name="blacklist-flusher", daemon=True)
+            self._flusher.start()
+    
+    def _flush_loop(self):
+        """Background loop coalescing pending changes into delayed saves."""
+        while not self._closed:
+            self._flush_wakeup.wait()
+            self._flush_wakeup.clear()
+            while self._dirty and not self._closed:
+                remaining = self._dirty_since + self.flush_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._flush_wakeup.wait(remaining)
+                self._flush_wakeup.clear()
+            if not self._closed:
+                self.flush()
+    
+    @_locked
+    def flush(self):
+        """Write any pending (deferred) changes to disk now."""
+        if self._dirty:
+            self._dirty = 0
+            self._save_data()
+    
+    @_locked
+    def set_storage_format(self, storage_format: str):
+        """
+        Switch the at-rest encoding and rewrite the data file in it.
+        
+        Args:
+            storage_format: Storage format name, e.g. "compact+gzip"
+        
+        Raises:
+            ValueError: If the format is unknown
+        """
+        storage.parse_format(storage_format)
+        self.storage_format = storage_format
+        self._dirty = 0
+        self._save_data()
+    
+    @contextmanager
+    def deferred_writes(self):
+        """
+        Defer saves for the duration of a block, then flush once.
+        
+        Usable whether or not write-back mode is enabled:
+        
+            with manager.deferred_writes():
+                for name in names:
+                    manager.add_entry(name, "Bulk")
+        """
+        with self._lock:
+            self._defer_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._defer_depth -= 1
+                if not self._defer_depth:
+                    self.flush()
+    
+    def close(self):
+        """
+        Flush pending changes and stop the background flusher.
+        
+        The manager stays usable; later changes are saved immediately.
+        """
+        # Under the lock, a concurrent mutation lands either before the
+        # final flush or after _closed is set (and then saves itself)
+        with self._lock:
+            self.flush()
+            self._closed = True
+        self._flush_wakeup.set()
+        _write_back_managers.discard(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @property
+    def revision(self) -> int:
+        """Counter bumped on every mutation, used by derived indexes to rebuild lazily."""
+        return self._revision
     
     def _generate_id(self) -> str:
         """Generate a unique ID for a new entry."""
@@ -64,8 +292,125 @@ class BlacklistManager:
         
         return f"BL{next_num:03d}"
     
+    @staticmethod
+    def _normalize_expiry(expires_at: Union[str, datetime, None]) -> Optional[str]:
+        """Validate an expiry time and return it as an ISO string (or None)."""
+        if not expires_at:
+            return None
+        if isinstance(expires_at, datetime):
+            return expires_at.isoformat()
+        return datetime.fromisoformat(expires_at).isoformat()
+    
+    @staticmethod
+    def _expiry_timestamp(entry: Dict) -> Optional[float]:
+        """
+        Return when an active entry expires as a POSIX timestamp.
+        
+        Returns None for entries that never expire, including ones whose
+        expires_at does not parse (e.g. from a hand-edited data file).
+        """
+        expires_at = entry.get("expires_at")
+        if not expires_at or entry.get("status", "active") != "active" or not entry.get("id"):
+            return None
+        try:
+            return datetime.fromisoformat(expires_at).timestamp()
+        except (TypeError, ValueError):
+            return None
+    
+    def _schedule_expiry(self, entry: Dict):
+        """Push an entry's expiry time onto the expiration heap."""
+        due = self._expiry_timestamp(entry)
+        if due is None:
+            self._expiring.pop(entry.get("id"), None)
+            return
+        self._expiring[entry["id"]] = due
+        heapq.heappush(self._expiry_heap, (due, entry["id"]))
+    
+    @classmethod
+    def _build_expiry_heap(cls, entries: List[Dict]):
+        """
+        Build an expiration heap from entries in O(n).
+        
+        Returns:
+            (heap of (timestamp, id), dict of id to due timestamp)
+        """
+        expiring = {}
+        heap = []
+        for entry in entries:
+            due = cls._expiry_timestamp(entry)
+            if due is None:
+                continue
+            expiring[entry["id"]] = due
+            heap.append((due, entry["id"]))
+        heapq.heapify(heap)
+        return heap, expiring
+    
+    def _rebuild_expiry_heap(self):
+        """Rebuild the expiration heap from the loaded entries."""
+        self._expiry_heap, self._expiring = self._build_expiry_heap(self.blacklist["entries"])
+    
+    def expire_due(self, now: Optional[float] = None) -> List[Dict]:
+        """
+        Flip active entries whose expiry time has passed to "expired".
+        
+        Cheap enough to call on every access or from a periodic timer: when
+        nothing is due it only compares against the top of the heap.
+        
+        Args:
+            now: POSIX timestamp to expire against (default: current time)
+        
+        Returns:
+            The entries that expired during this call
+        """
+        # Read the top once: a writer may pop the last item concurrently
+        try:
+            next_due = self._expiry_heap[0][0]
+        except IndexError:
+            return []
+        if now is None:
+            now = time.time()
+        if next_due > now:
+            return []
+        # Readers never wait on a writer; the expiry is retried on the next access
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            return self._expire_due_locked(now)
+        finally:
+            self._lock.release()
+    
+    def _expire_due_locked(self, now: float) -> List[Dict]:
+        """Pop and expire every due heap item; the write lock must be held."""
+        heap = self._expiry_heap
+        due_ids = set()
+        while heap and heap[0][0] <= now:
+            due, entry_id = heapq.heappop(heap)
+            # Skip stale heap items left behind by updates and removals
+            if self._expiring.get(entry_id) != due:
+                continue
+            del self._expiring[entry_id]
+            due_ids.add(entry_id)
+        if not due_ids:
+            return []
+        
+        expired = []
+        changes = []
+        entries = []
+        for entry in self.blacklist["entries"]:
+            if entry.get("id") in due_ids and entry.get("status", "active") == "active":
+                changes.append((entry, dict(entry, status="expired")))
+                entry = changes[-1][1]
+                expired.append(entry)
+            entries.append(entry)
+        self._publish(entries, changes, label="expire", automatic=True)
+        self._mark_changed()
+        return expired
+    
+    @_locked
     def add_entry(self, name: str, reason: str, threat_level: str = "Medium", 
-                  notes: str = "", category: str = "General") -> Dict:
+                  notes: str = "", category: str = "General",
+                  entry_type: Optional[str] = None,
+                  expires_at: Union[str, datetime, None] = None) -> Dict:
         """
         Add a new entry to the blacklist.
         
@@ -75,12 +420,73 @@ class BlacklistManager:
             threat_level: Threat level (Low, Medium, High, Critical)
             notes: Additional notes
             category: Category of the threat
+            entry_type: Optional network type (ip, cidr, domain, wildcard_domain);
+                the name is then parsed as that address, range or domain
+            expires_at: Optional expiry time (datetime or ISO string); the
+                entry turns "expired" once it has passed
         
         Returns:
             The created entry
+        
+        Raises:
+            ValueError: If entry_type is given and the name does not parse as it,
+                or expires_at is not a valid ISO timestamp
         """
+        entry = self._build_entry(self._generate_id(), name, reason, threat_level,
+                                  notes, category, entry_type, expires_at)
+        
+        self._publish(self.blacklist["entries"] + [entry], [(None, entry)])
+        self._schedule_expiry(entry)
+        self._mark_changed()
+        return entry
+    
+    @_locked
+    def add_entries(self, entries: Iterable[Dict]) -> List[Dict]:
+        """
+        Add many entries at once with a single save.
+        
+        Args:
+            entries: Dictionaries with the keyword arguments of add_entry
+                (name and reason required; missing or blank optional fields
+                take add_entry's defaults)
+        
+        Returns:
+            The created entries
+        
+        Raises:
+            ValueError: If any entry is invalid; nothing is added in that case
+        """
+        next_num = int(self._generate_id()[2:])
+        created = []
+        for i, fields in enumerate(entries):
+            if not isinstance(fields, dict):
+                raise ValueError(f"Entry {i + 1}: expected an object, got {type(fields).__name__}")
+            if not fields.get("name") or not fields.get("reason"):
+                raise ValueError(f"Entry {i + 1}: name and reason are required")
+            created.append(self._build_entry(
+                f"BL{next_num + i:03d}",
+                fields["name"],
+                fields["reason"],
+                fields.get("threat_level") or "Medium",
+                fields.get("notes") or "",
+                fields.get("category") or "General",
+                fields.get("entry_type") or None,
+                fields.get("expires_at") or None,
+            ))
+        
+        if created:
+            self._publish(self.blacklist["entries"] + created, [(None, entry) for entry in created])
+            for entry in created:
+                self._schedule_expiry(entry)
+            self._mark_changed()
+        return created
+    
+    def _build_entry(self, entry_id: str, name: str, reason: str, threat_level: str,
+                     notes: str, category: str, entry_type: Optional[str],
+                     expires_at: Union[str, datetime, None]) -> Dict:
+        """Create and validate a new entry dictionary."""
         entry = {
-            "id": self._generate_id(),
+            "id": entry_id,
             "name": name,
             "reason": reason,
             "threat_level": threat_level,
@@ -90,11 +496,15 @@ class BlacklistManager:
             "last_updated": datetime.now().isoformat(),
             "status": "active"
         }
-        
-        self.blacklist["entries"].append(entry)
-        self._save_data()
+        if entry_type:
+            entry["entry_type"] = entry_type
+            entry["value"] = normalize_network_value(entry_type, name)
+        expires_at = self._normalize_expiry(expires_at)
+        if expires_at:
+            entry["expires_at"] = expires_at
         return entry
     
+    @_locked
     def remove_entry(self, identifier: str) -> Optional[Dict]:
         """
         Remove an entry from the blacklist.
@@ -105,30 +515,52 @@ class BlacklistManager:
         Returns:
             The removed entry, or None if not found
         """
-        for i, entry in enumerate(self.blacklist["entries"]):
+        entries = self.blacklist["entries"]
+        for i, entry in enumerate(entries):
             if entry.get("id") == identifier or entry.get("name").lower() == identifier.lower():
-                removed = self.blacklist["entries"].pop(i)
-                self._save_data()
-                return removed
+                self._publish(entries[:i] + entries[i + 1:], [(entry, None)])
+                self._expiring.pop(entry.get("id"), None)
+                self._mark_changed()
+                return entry
         
         return None
     
+    @_locked
     def update_entry(self, identifier: str, **updates) -> Optional[Dict]:
         """
         Update an existing entry.
         
         Args:
             identifier: ID or name of the entry to update
-            **updates: Fields to update
+            **updates: Fields to update; passing expires_at re-arms (or, when
+                empty, clears) the expiry and reactivates an expired entry
         
         Returns:
             The updated entry, or None if not found
         """
-        for entry in self.blacklist["entries"]:
+        entries = self.blacklist["entries"]
+        for i, entry in enumerate(entries):
             if entry.get("id") == identifier or entry.get("name").lower() == identifier.lower():
-                entry.update(updates)
+                entry_type = updates.get("entry_type", entry.get("entry_type"))
+                if entry_type:
+                    updates["value"] = normalize_network_value(
+                        entry_type, updates.get("name", entry.get("name", "")))
+                if "expires_at" in updates:
+                    updates["expires_at"] = self._normalize_expiry(updates["expires_at"])
+                    if entry.get("status") == "expired" and "status" not in updates:
+                        updates["status"] = "active"
+                entry = dict(entry, **updates)
+                if entry.get("expires_at") is None:
+                    entry.pop("expires_at", None)
+                elif (entry.get("status") == "active"
+                      and (self._expiry_timestamp(entry) or float("inf")) <= time.time()):
+                    entry["status"] = "expired"
                 entry["last_updated"] = datetime.now().isoformat()
-                self._save_data()
+                
+                self._publish(entries[:i] + [entry] + entries[i + 1:], [(entries[i], entry)])
+                if "expires_at" in updates or "status" in updates:
+                    self._schedule_expiry(entry)
+                self._mark_changed()
                 return entry
         
         return None
@@ -143,6 +575,7 @@ class BlacklistManager:
         Returns:
             The entry, or None if not found
         """
+        self.expire_due()
         for entry in self.blacklist["entries"]:
             if entry.get("id") == identifier or entry.get("name").lower() == identifier.lower():
                 return entry
@@ -150,7 +583,7 @@ class BlacklistManager:
         return None
     
     def search_entries(self, query: str = "", threat_level: str = "", 
-                      category: str = "") -> List[Dict]:
+                      category: str = "", include_expired: bool = False) -> List[Dict]:
         """
         Search for entries matching criteria.
         
@@ -158,14 +591,19 @@ class BlacklistManager:
             query: Search query (matches name, reason, notes)
             threat_level: Filter by threat level
             category: Filter by category
+            include_expired: Also return entries whose expiry has passed
         
         Returns:
             List of matching entries
         """
+        self.expire_due()
         results = []
         query_lower = query.lower()
         
         for entry in self.blacklist["entries"]:
+            if not include_expired and entry.get("status") == "expired":
+                continue
+            
             # Check query match
             if query:
                 searchable_text = f"{entry.get('name', '')} {entry.get('reason', '')} {entry.get('notes', '')}".lower()
@@ -184,21 +622,26 @@ class BlacklistManager:
         
         return results
     
-    def list_all_entries(self, sort_by: str = "threat_level") -> List[Dict]:
+    def list_all_entries(self, sort_by: str = "threat_level",
+                         include_expired: bool = False) -> List[Dict]:
         """
         List all entries, optionally sorted.
         
         Args:
             sort_by: Field to sort by (threat_level, date_added, name)
+            include_expired: Also list entries whose expiry has passed
         
         Returns:
             List of all entries
         """
-        entries = self.blacklist["entries"].copy()
+        self.expire_due()
+        if include_expired:
+            entries = self.blacklist["entries"].copy()
+        else:
+            entries = [entry for entry in self.blacklist["entries"] if entry.get("status") != "expired"]
         
         if sort_by == "threat_level":
-            threat_order = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
-            entries.sort(key=lambda x: threat_order.get(x.get("threat_level", "Medium"), 2))
+            entries.sort(key=lambda x: THREAT_ORDER.get(x.get("threat_level", "Medium"), 2))
         elif sort_by == "date_added":
             entries.sort(key=lambda x: x.get("date_added", ""), reverse=True)
         elif sort_by == "name":
@@ -206,19 +649,197 @@ class BlacklistManager:
         
         return entries
     
-    def get_statistics(self) -> Dict:
+    def top_entries(self, k: int = 20, rank_by: Sequence[str] = DEFAULT_RANKING,
+                    filters: Optional[Dict] = None,
+                    category_weights: Optional[Dict[str, int]] = None,
+                    include_expired: bool = False) -> List[Dict]:
+        """
+        Get the k highest-ranked entries without sorting the whole list.
+        
+        Entries are bucketed by threat level in one pass when that is the
+        first ranking key; heap-based partial selection then runs only on
+        the most severe buckets needed to fill k. The cost is O(n + k log k)
+        instead of the O(n log n) of list_all_entries plus a slice.
+        
+        Args:
+            k: Number of entries to return
+            rank_by: Ranking keys, compared in order: threat_level (most severe
+                first), date_added / last_updated (newest first, compared as
+                ISO strings), category (highest weight first), name (A-Z)
+            filters: Field values entries must equal, e.g. {"category": "Fraud"}
+            category_weights: Weight per category for the category key
+            include_expired: Also rank entries whose expiry has passed
+        
+        Returns:
+            Up to k entries, best first
+        
+        Raises:
+            ValueError: If rank_by contains an unknown key
+        """
+        weights = category_weights or {}
+        # Every key part maps an entry to a value where larger ranks higher
+        parts = []
+        for field in rank_by:
+            if field == "threat_level":
+                parts.append(lambda e: -THREAT_ORDER.get(e.get("threat_level", "Medium"), 2))
+            elif field in ("date_added", "last_updated"):
+                parts.append(lambda e, field=field: e.get(field, ""))
+            elif field == "category":
+                parts.append(lambda e: weights.get(e.get("category", "General"), 0))
+            elif field == "name":
+                parts.append(lambda e: _Descending(e.get("name", "").lower()))
+            else:
+                raise ValueError(f"Unknown ranking key: {field}")
+        if k <= 0:
+            return []
+        
+        self.expire_due()
+        candidates = self.blacklist["entries"]
+        if not include_expired:
+            candidates = [e for e in candidates if e.get("status") != "expired"]
+        for field, value in (filters or {}).items():
+            candidates = [e for e in candidates if e.get(field) == value]
+        
+        by_severity = bool(parts) and rank_by[0] == "threat_level"
+        if by_severity:
+            parts = parts[1:]
+        if not parts:
+            key = None
+        elif len(parts) == 1:
+            key = parts[0]
+        else:
+            key = lambda e: tuple([part(e) for part in parts])
+        
+        if not by_severity:
+            if key is None:
+                return candidates[:k]
+            return heapq.nlargest(k, candidates, key=key)
+        
+        buckets = [[] for _ in range(len(THREAT_ORDER))]
+        for entry in candidates:
+            buckets[THREAT_ORDER.get(entry.get("threat_level", "Medium"), 2)].append(entry)
+        
+        results = []
+        for bucket in buckets:
+            need = k - len(results)
+            if need <= 0:
+                break
+            results.extend(bucket[:need] if key is None else heapq.nlargest(need, bucket, key=key))
+        return results
+    
+    def _get_name_index(self) -> Dict[str, Dict]:
+        """Return a map of lowercased ID/name to active entry, rebuilding it if entries changed."""
+        self.expire_due()
+        revision, index = self._name_index
+        if index is None or revision != self._revision:
+            # Read the revision before the state so a racing write only causes a rebuild
+            revision = self._revision
+            index = {}
+            for entry in self.blacklist["entries"]:
+                if entry.get("status", "active") != "active":
+                    continue
+                index.setdefault(entry.get("name", "").strip().lower(), entry)
+                index.setdefault(entry.get("id", "").lower(), entry)
+            self._name_index = (revision, index)
+        return index
+    
+    def check_names(self, names: Iterable[str]) -> List[Optional[Dict]]:
+        """
+        Check many names or IDs for active blacklist membership.
+        
+        Args:
+            names: Names or entry IDs (matched case-insensitively)
+        
+        Returns:
+            The matching active entry (or None) for each name, in order
+        """
+        index = self._get_name_index()
+        return [index.get(name.strip().lower()) for name in names]
+    
+    def _get_network_index(self) -> NetworkIndex:
+        """Return the network index, rebuilding it if entries changed."""
+        self.expire_due()
+        revision, index = self._network_index
+        if index is None or revision != self._revision:
+            revision = self._revision
+            index = NetworkIndex(self.blacklist["entries"])
+            self._network_index = (revision, index)
+        return index
+    
+    def match_ip(self, address: str) -> Optional[Dict]:
+        """
+        Find the most specific active ip/cidr entry covering an address.
+        
+        Args:
+            address: IPv4 or IPv6 address
+        
+        Returns:
+            The matching entry, or None if not covered (or not a valid address)
+        """
+        return self._get_network_index().match_ip(address)
+    
+    def match_ips(self, addresses: List[str]) -> List[Optional[Dict]]:
+        """
+        Batch variant of match_ip.
+        
+        Args:
+            addresses: IPv4 or IPv6 addresses
+        
+        Returns:
+            The matching entry (or None) for each address, in order
+        """
+        index = self._get_network_index()
+        return [index.match_ip(address) for address in addresses]
+    
+    def match_domain(self, domain: str) -> Optional[Dict]:
+        """
+        Find the most specific active domain or wildcard entry covering a domain.
+        
+        Args:
+            domain: Fully qualified domain name
+        
+        Returns:
+            The matching entry, or None if not covered
+        """
+        return self._get_network_index().match_domain(domain)
+    
+    def match_domains(self, domains: List[str]) -> List[Optional[Dict]]:
+        """
+        Batch variant of match_domain.
+        
+        Args:
+            domains: Fully qualified domain names
+        
+        Returns:
+            The matching entry (or None) for each domain, in order
+        """
+        index = self._get_network_index()
+        return [index.match_domain(domain) for domain in domains]
+    
+    def get_statistics(self, include_expired: bool = False) -> Dict:
         """
         Get statistics about the blacklist.
         
+        Args:
+            include_expired: Count entries whose expiry has passed
+        
         Returns:
             Dictionary containing statistics
         """
-        total = len(self.blacklist["entries"])
+        self.expire_due()
+        total = 0
+        expired = 0
         
         threat_counts = {"Low": 0, "Medium": 0, "High": 0, "Critical": 0}
         category_counts = {}
         
         for entry in self.blacklist["entries"]:
+            if entry.get("status") == "expired":
+                expired += 1
+                if not include_expired:
+                    continue
+            total += 1
+            
             threat_level = entry.get("threat_level", "Medium")
             threat_counts[threat_level] = threat_counts.get(threat_level, 0) + 1
             
@@ -227,29 +848,190 @@ class BlacklistManager:
         
         return {
             "total_entries": total,
+            "expired_entries": expired,
             "threat_level_breakdown": threat_counts,
             "category_breakdown": category_counts,
             "last_updated": datetime.now().isoformat()
         }
     
-    def export_to_file(self, filename: str):
+    def export_to_file(self, filename: str, storage_format: str = storage.DEFAULT_FORMAT):
         """
         Export blacklist to a file.
         
         Args:
             filename: Output filename
+            storage_format: Storage format name (default: indented JSON)
         """
-        with open(filename, 'w') as f:
-            json.dump(self.blacklist, f, indent=2)
+        storage.write_file(filename, self.blacklist, storage_format)
     
+    @_locked
     def import_from_file(self, filename: str):
         """
         Import blacklist from a file.
         
         Args:
-            filename: Input filename
+            filename: Input filename, in any storage format
+        
+        Raises:
+            ValueError: If the file is not valid blacklist data; the current
+                entries are left untouched in that case
         """
-        with open(filename, 'r') as f:
-            imported_data = json.load(f)
-            self.blacklist = imported_data
-            self._save_data()
+        imported_data, _ = storage.read_file(filename)
+        entries = imported_data.get("entries")
+        if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+            raise ValueError(f"{filename}: expected an \"entries\" list of objects")
+        heap, expiring = self._build_expiry_heap(entries)
+        
+        previous = self.blacklist["entries"]
+        if self._versions is not None:
+            self._versions.commit(self._entry_changes(previous, entries),
+                                  label=f"import {os.path.basename(filename)}")
+        self.blacklist = imported_data
+        self._expiry_heap, self._expiring = heap, expiring
+        self._mark_changed()
+    
+    @staticmethod
+    def _entry_changes(old_entries: List[Dict], new_entries: List[Dict]) -> List:
+        """Pair up entries by ID into (old or None, new or None) changes."""
+        old_by_id = {entry.get("id"): entry for entry in old_entries}
+        changes = []
+        for entry in new_entries:
+            old = old_by_id.pop(entry.get("id"), None)
+            if old != entry:
+                changes.append((old, entry))
+        changes.extend((old, None) for old in old_by_id.values())
+        return changes
+    
+    def _require_versioning(self) -> VersionStore:
+        """Return the version store, or raise if versioning is disabled."""
+        if self._versions is None:
+            raise ValueError("Versioning is not enabled for this BlacklistManager")
+        return self._versions
+    
+    @_locked
+    def snapshot(self, label: str = "") -> int:
+        """
+        Record a labelled version of the current entries.
+        
+        Costs O(1): the version shares all structure with the previous one.
+        
+        Args:
+            label: Description of the snapshot
+        
+        Returns:
+            The version number, usable with diff() and rollback()
+        
+        Raises:
+            ValueError: If versioning is disabled
+        """
+        versions = self._require_versioning()
+        version = versions.commit((), label=label)
+        # No entries changed, so only the history log is appended to. With
+        # unsaved entry changes pending, the record waits for their save so
+        # the log never gets ahead of the data file.
+        if not self._dirty and not self._defer_depth:
+            versions.flush_log()
+        return version
+    
+    @_locked
+    def diff(self, v1: int, v2: Optional[int] = None) -> List[Dict]:
+        """
+        List entry changes between two versions.
+        
+        Only subtrees that differ between the versions are visited.
+        
+        Args:
+            v1: Earlier version
+            v2: Later version (default: the current version)
+        
+        Returns:
+            One {"id", "before", "after"} dict per changed entry; before is
+            None for added entries and after is None for removed ones
+        
+        Raises:
+            ValueError: If versioning is disabled or a version is not retained
+        """
+        versions = self._require_versioning()
+        return versions.diff(v1, versions.version if v2 is None else v2)
+    
+    @_locked
+    def list_versions(self) -> List[Dict]:
+        """
+        Describe the retained versions, oldest first.
+        
+        Raises:
+            ValueError: If versioning is disabled
+        """
+        return self._require_versioning().list_versions()
+    
+    @property
+    def current_version(self) -> int:
+        """The current version number (0 when versioning is disabled)."""
+        return self._versions.version if self._versions is not None else 0
+    
+    @_locked
+    def rollback(self, version: int) -> int:
+        """
+        Restore the entries of an earlier version.
+        
+        The rollback is itself recorded as a new version, so it can be undone.
+        Entries keep their current order; restored entries are appended.
+        Restored entries whose expiry time has passed come back expired.
+        
+        Args:
+            version: Version to restore
+        
+        Returns:
+            The new version number
+        
+        Raises:
+            ValueError: If versioning is disabled or the version is not retained
+        """
+        versions = self._require_versioning()
+        target = versions.get(version)
+        now = time.time()
+        
+        changes = []
+        restored = {}
+        for entry_id, before, after in versions.current.diff(target):
+            if after is not None:
+                due = self._expiry_timestamp(after)
+                if due is not None and due <= now:
+                    after = dict(after, status="expired")
+                    if after == before:
+                        continue
+                restored[entry_id] = after
+            changes.append((before, after))
+        
+        entries = []
+        for entry in self.blacklist["entries"]:
+            entry_id = entry.get("id")
+            if entry_id in restored:
+                entries.append(restored.pop(entry_id))
+            elif target.get(entry_id) is not None:
+                entries.append(entry)
+        entries.extend(restored.values())
+        
+        self._publish(entries, changes, label=f"rollback to {version}")
+        self._rebuild_expiry_heap()
+        self._mark_changed()
+        return versions.version
+    
+    @_locked
+    def undo(self) -> int:
+        """
+        Undo the most recent change; repeated calls step further back.
+        
+        Returns:
+            The new version number
+        
+        Raises:
+            ValueError: If versioning is disabled or there is nothing to undo
+        """
+        versions = self._require_versioning()
+        target = versions.undo_target()
+        if not versions.has(target):
+            raise ValueError("Nothing to undo")
+        new_version = self.rollback(target)
+        versions.mark_undo(target)
+        return new_version
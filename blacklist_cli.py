@@ -0,0 +1,311 @@
+"""
+Headless Command-Line Interface for Blacklist Management Tool
+Batch checks, search and bulk operations for shell pipelines and cron jobs.
+Does not depend on PyQt6 or pygame.
+"""
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from blacklist import BlacklistManager
+from network_index import ENTRY_TYPES
+
+
+CHECK_BATCH_SIZE = 10000
+
+
+def _format_record(record: Dict, output_format: str, first: bool) -> str:
+    """Render one result record in the chosen output format."""
+    if output_format == "ndjson":
+        return json.dumps(record, separators=(",", ":")) + "\n"
+    if output_format == "json":
+        return ("" if first else ",\n") + json.dumps(record)
+    return "\t".join("" if value is None else str(value) for value in record.values()) + "\n"
+
+
+class _RecordWriter:
+    """Writes result records to a stream, handling JSON array framing."""
+
+    def __init__(self, stream: TextIO, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        self.count = 0
+        if output_format == "json":
+            stream.write("[\n")
+
+    def write_batch(self, records: List[Dict]):
+        """Render and write a batch of records with a single write call."""
+        parts = []
+        for record in records:
+            parts.append(_format_record(record, self.output_format, self.count == 0))
+            self.count += 1
+        if parts:
+            self.stream.write("".join(parts))
+
+    def close(self):
+        """Finish the output and flush it."""
+        if self.output_format == "json":
+            self.stream.write("\n]\n" if self.count else "]\n")
+        self.stream.flush()
+
+
+def _read_batches(stream: TextIO, batch_size: int) -> Iterator[List[str]]:
+    """Yield non-empty stripped lines from a stream in fixed-size batches."""
+    lines = (line.strip() for line in stream)
+    lines = (line for line in lines if line)
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+def cmd_check(manager: BlacklistManager, args) -> int:
+    """Check names, IPs or domains read from stdin, one per line."""
+    if args.kind == "ip":
+        lookup = manager.match_ips
+    elif args.kind == "domain":
+        lookup = manager.match_domains
+    else:
+        lookup = manager.check_names
+
+    writer = _RecordWriter(sys.stdout, args.format)
+    matched = 0
+    for batch in _read_batches(sys.stdin, args.batch_size):
+        records = []
+        for value, entry in zip(batch, lookup(batch)):
+            if entry is not None:
+                matched += 1
+            elif args.matches_only:
+                continue
+            records.append({
+                "input": value,
+                "blacklisted": entry is not None,
+                "id": entry["id"] if entry else None,
+                "threat_level": entry.get("threat_level", "Medium") if entry else None,
+            })
+        writer.write_batch(records)
+    writer.close()
+    return 0 if matched else 1
+
+
+def cmd_search(manager: BlacklistManager, args) -> int:
+    """Search entries and print them."""
+    results = manager.search_entries(args.query, args.threat_level, args.category,
+                                     include_expired=args.include_expired)
+    writer = _RecordWriter(sys.stdout, args.format)
+    if args.format == "text":
+        writer.write_batch([
+            {"id": e["id"], "name": e["name"], "threat_level": e["threat_level"],
+             "category": e.get("category", "General"), "reason": e["reason"]}
+            for e in results
+        ])
+    else:
+        writer.write_batch(results)
+    writer.close()
+    return 0 if results else 1
+
+
+def cmd_top(manager: BlacklistManager, args) -> int:
+    """Print the highest-ranked entries."""
+    results = manager.top_entries(args.k, rank_by=args.rank_by.split(","),
+                                  include_expired=args.include_expired)
+    writer = _RecordWriter(sys.stdout, args.format)
+    if args.format == "text":
+        writer.write_batch([
+            {"id": e["id"], "name": e["name"], "threat_level": e["threat_level"],
+             "category": e.get("category", "General"), "date_added": e.get("date_added", "")}
+            for e in results
+        ])
+    else:
+        writer.write_batch(results)
+    writer.close()
+    return 0
+
+
+def cmd_add(manager: BlacklistManager, args) -> int:
+    """Add a single entry."""
+    entry = manager.add_entry(args.name, args.reason, args.threat_level, args.notes,
+                              args.category, entry_type=args.type,
+                              expires_at=args.expires_at)
+    print(json.dumps(entry) if args.format != "text" else entry["id"])
+    return 0
+
+
+def _load_import_records(stream: TextIO, input_format: str, reason: str) -> List[Dict]:
+    """Parse bulk-import input into add_entries records."""
+    if input_format == "json":
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError("JSON input must be an array of objects")
+    elif input_format == "ndjson":
+        records = [json.loads(line) for line in stream if line.strip()]
+    elif input_format == "csv":
+        records = list(csv.DictReader(stream))
+    else:
+        # Plain lines: one name per line, all sharing the --reason
+        records = [{"name": line.strip(), "reason": reason} for line in stream if line.strip()]
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {i + 1}: expected an object, got {type(record).__name__}")
+    return records
+
+
+def cmd_bulk_import(manager: BlacklistManager, args) -> int:
+    """Add many entries from a file or stdin with a single save."""
+    if args.input == "-":
+        records = _load_import_records(sys.stdin, args.input_format, args.reason)
+    else:
+        with open(args.input, 'r', encoding='utf-8', newline='') as f:
+            records = _load_import_records(f, args.input_format, args.reason)
+
+    for record in records:
+        if args.type and not record.get("entry_type"):
+            record["entry_type"] = args.type
+        if not record.get("reason"):
+            record["reason"] = args.reason
+    created = manager.add_entries(records)
+    print(f"Imported {len(created)} entries", file=sys.stderr)
+    return 0
+
+
+def cmd_export(manager: BlacklistManager, args) -> int:
+    """Export entries to a file or stdout."""
+    entries = manager.list_all_entries(args.sort, include_expired=args.include_expired)
+    stream = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        if args.format == "json":
+            json.dump({"entries": entries, "metadata": manager.blacklist.get("metadata", {})},
+                      stream, indent=2)
+            stream.write("\n")
+        else:
+            writer = _RecordWriter(stream, "ndjson")
+            for start in range(0, len(entries), CHECK_BATCH_SIZE):
+                writer.write_batch(entries[start:start + CHECK_BATCH_SIZE])
+            writer.close()
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+def cmd_scan(manager: BlacklistManager, args) -> int:
+    """Scan files or stdin for blacklisted names."""
+    from scanner import BlacklistScanner
+
+    scanner = BlacklistScanner(manager, case_insensitive=not args.case_sensitive,
+                               whole_words=not args.substrings)
+    writer = _RecordWriter(sys.stdout, args.format)
+    matched = 0
+    for source in args.files or ["-"]:
+        matches = scanner.scan_file(source)
+        while True:
+            batch = [dict(match, source=source) for match in islice(matches, CHECK_BATCH_SIZE)]
+            if not batch:
+                break
+            matched += len(batch)
+            writer.write_batch(batch)
+    writer.close()
+    return 0 if matched else 1
+
+
+def cmd_convert(manager: BlacklistManager, args) -> int:
+    """Rewrite the data file in another storage format."""
+    previous = manager.storage_format
+    manager.set_storage_format(args.target_format)
+    print(f"Converted {args.data_file} from {previous} to {args.target_format}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(prog="blacklist", description="Headless blacklist management")
+    parser.add_argument("--data-file", default="data/blacklist.json",
+                        help="Path to the blacklist JSON file")
+    parser.add_argument("--storage-format",
+                        help="At-rest encoding for saves, e.g. compact or columnar+gzip "
+                             "(default: keep the file's current format)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    formats = ["text", "json", "ndjson"]
+
+    check = subparsers.add_parser("check", help="Check values from stdin (exit 1 if none match)")
+    check.add_argument("--kind", choices=["name", "ip", "domain"], default="name")
+    check.add_argument("--format", choices=formats, default="text")
+    check.add_argument("--matches-only", action="store_true", help="Only print blacklisted inputs")
+    check.add_argument("--batch-size", type=int, default=CHECK_BATCH_SIZE)
+    check.set_defaults(func=cmd_check)
+
+    search = subparsers.add_parser("search", help="Search entries (exit 1 if none found)")
+    search.add_argument("query", nargs="?", default="")
+    search.add_argument("--threat-level", default="")
+    search.add_argument("--category", default="")
+    search.add_argument("--include-expired", action="store_true")
+    search.add_argument("--format", choices=formats, default="text")
+    search.set_defaults(func=cmd_search)
+
+    top = subparsers.add_parser("top", help="Show the highest-ranked entries")
+    top.add_argument("-k", type=int, default=20)
+    top.add_argument("--rank-by", default="threat_level,date_added,category",
+                     help="Comma-separated ranking keys")
+    top.add_argument("--include-expired", action="store_true")
+    top.add_argument("--format", choices=formats, default="text")
+    top.set_defaults(func=cmd_top)
+
+    add = subparsers.add_parser("add", help="Add an entry")
+    add.add_argument("name")
+    add.add_argument("reason")
+    add.add_argument("--threat-level", default="Medium")
+    add.add_argument("--category", default="General")
+    add.add_argument("--notes", default="")
+    add.add_argument("--type", choices=ENTRY_TYPES)
+    add.add_argument("--expires-at", help="ISO timestamp")
+    add.add_argument("--format", choices=formats, default="text")
+    add.set_defaults(func=cmd_add)
+
+    bulk = subparsers.add_parser("bulk-import", help="Add many entries with a single save")
+    bulk.add_argument("input", nargs="?", default="-", help="Input file (default: stdin)")
+    bulk.add_argument("--input-format", choices=["lines", "csv", "json", "ndjson"], default="lines")
+    bulk.add_argument("--reason", default="Bulk import", help="Reason for records without one")
+    bulk.add_argument("--type", choices=ENTRY_TYPES)
+    bulk.set_defaults(func=cmd_bulk_import)
+
+    export = subparsers.add_parser("export", help="Export entries")
+    export.add_argument("output", nargs="?", default="-", help="Output file (default: stdout)")
+    export.add_argument("--format", choices=["json", "ndjson"], default="json")
+    export.add_argument("--sort", choices=["threat_level", "date_added", "name"], default="threat_level")
+    export.add_argument("--include-expired", action="store_true")
+    export.set_defaults(func=cmd_export)
+
+    scan = subparsers.add_parser("scan", help="Find blacklisted names in files or stdin")
+    scan.add_argument("files", nargs="*")
+    scan.add_argument("--case-sensitive", action="store_true")
+    scan.add_argument("--substrings", action="store_true", help="Also match inside words")
+    scan.add_argument("--format", choices=formats, default="text")
+    scan.set_defaults(func=cmd_scan)
+
+    convert = subparsers.add_parser("convert", help="Rewrite the data file in another storage format")
+    convert.add_argument("target_format", metavar="storage_format",
+                         help="Layout (pretty, compact, columnar) optionally followed by +gzip or +lzma")
+    convert.set_defaults(func=cmd_convert)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for the headless CLI."""
+    args = build_parser().parse_args(argv)
+    try:
+        manager = BlacklistManager(args.data_file, storage_format=args.storage_format)
+        return args.func(manager, args)
+    except BrokenPipeError:
+        return 0
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
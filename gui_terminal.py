@@ -9,9 +9,10 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QTextEdit, QLineEdit, QLabel, QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer
 from PyQt6.QtGui import QFont, QTextCursor, QColor, QPalette
 from blacklist import BlacklistManager
+from live_search import LiveSearch
 
 
 class TerminalEmulator(QObject):
@@ -19,10 +20,16 @@ class TerminalEmulator(QObject):
     
     output_signal = pyqtSignal(str)
     prompt_signal = pyqtSignal(str)
+    suggestions_signal = pyqtSignal(str)
+    # Emitted from the live search worker thread once a rebuilt index is ready
+    search_index_ready_signal = pyqtSignal()
     
     def __init__(self, manager):
         super().__init__()
         self.manager = manager
+        # Index (re)builds run on a worker thread so typing never waits on them
+        self.live_search = LiveSearch(manager, background=True,
+                                      on_ready=self.search_index_ready_signal.emit)
         self.state = "MENU"
         self.current_operation = None
         self.temp_data = {}
@@ -64,6 +71,8 @@ class TerminalEmulator(QObject):
            3. Search
            4. Update
            5. List all
+           6. Top threats
+           7. Undo last change
            0. Exit
 
 """
@@ -85,6 +94,10 @@ class TerminalEmulator(QObject):
             self.start_update()
         elif choice == "5":
             self.start_list()
+        elif choice == "6":
+            self.show_top_threats()
+        elif choice == "7":
+            self.undo_last_change()
         elif choice == "0":
             self.output_signal.emit("\n👋 Goodbye!\n")
             QApplication.quit()
@@ -192,9 +205,24 @@ Date Added: {entry['date_added'][:19]}
     def start_search(self):
         """Start the search process."""
         self.output_signal.emit("\n--- SEARCH ENTRIES ---\n")
+        self.live_search.prepare()
         self.state = "SEARCH_QUERY"
         self.prompt_signal.emit("Search query (name, reason, notes): ")
     
+    def update_suggestions(self, partial_query):
+        """Show live name/ID suggestions while a search query is typed."""
+        if self.state != "SEARCH_QUERY":
+            return
+        
+        try:
+            results = self.live_search.suggest(partial_query)
+        except Exception as e:
+            self.suggestions_signal.emit(f"❌ {e}")
+            return
+        
+        lines = [f"{entry['id']} | {entry['name'][:30]} [{entry['threat_level']}]" for entry in results]
+        self.suggestions_signal.emit("\n".join(lines))
+    
     def handle_search(self, query):
         """Handle search."""
         query = query.strip()
@@ -329,6 +357,36 @@ Date Added: {entry['date_added'][:19]}
         
         self.show_menu()
     
+    def show_top_threats(self, count=20):
+        """Show the most severe, most recent entries."""
+        self.output_signal.emit("\n--- TOP THREATS ---\n")
+        try:
+            entries = self.manager.top_entries(count)
+            if entries:
+                output = f"\n✅ Top {len(entries)} entries:\n\n"
+                for rank, entry in enumerate(entries, 1):
+                    output += f"{rank:>2}. ID: {entry['id']} | {entry['name']}\n"
+                    output += f"    Threat: {entry['threat_level']} | Category: {entry.get('category', 'General')}\n"
+                    output += f"    Added: {entry['date_added'][:10]}\n"
+                self.output_signal.emit(output)
+            else:
+                self.output_signal.emit("❌ No entries in the blacklist.\n")
+        except Exception as e:
+            self.output_signal.emit(f"❌ Error listing top threats: {e}\n")
+        
+        self.show_menu()
+    
+    def undo_last_change(self):
+        """Undo the most recent change to the blacklist."""
+        self.output_signal.emit("\n--- UNDO ---\n")
+        try:
+            version = self.manager.undo()
+            self.output_signal.emit(f"✅ Last change undone (now at version {version})\n")
+        except Exception as e:
+            self.output_signal.emit(f"❌ Undo failed: {e}\n")
+        
+        self.show_menu()
+    
     def show_statistics(self):
         """Show statistics."""
         self.output_signal.emit("\n--- STATISTICS ---\n")
@@ -399,9 +457,16 @@ class TerminalGUI(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.manager = BlacklistManager()
+        # Coalesce bursts of edits into a single save; flushed on close.
+        # Versioning keeps a change history for undo.
+        self.manager = BlacklistManager(write_back=True, versioning=True)
         self.terminal = TerminalEmulator(self.manager)
         
+        # Periodically flip entries past their expiry time
+        self.expiry_timer = QTimer(self)
+        self.expiry_timer.timeout.connect(self.manager.expire_due)
+        self.expiry_timer.start(60 * 1000)
+        
         # Initialize pygame mixer for MIDI playback
         # Set ENABLE_MUSIC to False to disable background music
         self.ENABLE_MUSIC = True  # Dramatic theme enabled
@@ -543,12 +608,26 @@ class TerminalGUI(QMainWindow):
             }
         """)
         self.input_field.returnPressed.connect(self.handle_input)
+        self.input_field.textEdited.connect(self.schedule_live_search)
         
         input_layout.addWidget(self.prompt_label)
         input_layout.addWidget(self.input_field)
         
         layout.addWidget(input_frame)
         
+        # Live search suggestions, shown while typing a search query
+        self.suggestions_label = QLabel()
+        self.suggestions_label.setFont(QFont("Courier", 9))
+        self.suggestions_label.setStyleSheet("color: #ff0000; padding: 2px 10px;")
+        self.suggestions_label.hide()
+        layout.addWidget(self.suggestions_label)
+        
+        # Debounce keystrokes so only the latest text is searched
+        self.live_search_timer = QTimer(self)
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.setInterval(120)
+        self.live_search_timer.timeout.connect(self.run_live_search)
+        
         # Focus on input
         self.input_field.setFocus()
     
@@ -556,6 +635,9 @@ class TerminalGUI(QMainWindow):
         """Connect terminal emulator signals."""
         self.terminal.output_signal.connect(self.append_output)
         self.terminal.prompt_signal.connect(self.set_prompt)
+        self.terminal.suggestions_signal.connect(self.show_suggestions)
+        # Refresh suggestions for text typed while the index was rebuilding
+        self.terminal.search_index_ready_signal.connect(self.run_live_search)
     
     def show_banner(self):
         """Show the application banner."""
@@ -589,10 +671,28 @@ Respect
         """Set the prompt label."""
         self.prompt_label.setText(prompt_text)
     
+    def schedule_live_search(self, text):
+        """Restart the debounce timer on each keystroke in search mode."""
+        if self.terminal.state == "SEARCH_QUERY":
+            self.live_search_timer.start()
+    
+    def run_live_search(self):
+        """Run the live search for the current input text."""
+        self.terminal.update_suggestions(self.input_field.text())
+    
+    def show_suggestions(self, text):
+        """Show or hide the live search suggestions."""
+        self.suggestions_label.setText(text)
+        self.suggestions_label.setVisible(bool(text))
+    
     def handle_input(self):
         """Handle user input."""
         user_input = self.input_field.text()
         
+        # Drop any pending live search and its suggestions
+        self.live_search_timer.stop()
+        self.show_suggestions("")
+        
         # Echo input to display
         self.append_output(f"{self.prompt_label.text()}{user_input}\n")
         
@@ -619,7 +719,8 @@ Respect
             self.dragging = False
     
     def closeEvent(self, event):
-        """Handle window close event - stop music."""
+        """Handle window close event - flush pending changes and stop music."""
+        self.manager.close()
         if self.ENABLE_MUSIC:
             pygame.mixer.music.stop()
             pygame.mixer.quit()
@@ -0,0 +1,211 @@
+"""
+Live Search Index
+Search-as-you-type over entry names and IDs, ranked by threat level.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blacklist import THREAT_ORDER, BlacklistManager
+from scanner import normalize_name
+
+
+# Sorts after any character a key can contain, closing a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+class PrefixSearchIndex:
+    """
+    Prefix index over normalized names and IDs, one bucket per threat level.
+
+    Each bucket holds its keys in sorted order, which acts as a flattened
+    prefix trie: all keys sharing a prefix form one contiguous range, found
+    with two binary searches. Walking the buckets from most to least severe
+    yields the top-k matches without looking at the rest of the range.
+    """
+
+    def __init__(self, entries: List[Dict]):
+        """
+        Build the index.
+
+        Args:
+            entries: Blacklist entries; only active entries are indexed
+        """
+        buckets: List[List[str]] = [[] for _ in range(len(THREAT_ORDER))]
+        owners: List[List[int]] = [[] for _ in range(len(THREAT_ORDER))]
+        self._entries = []
+        for entry in entries:
+            if entry.get("status", "active") != "active":
+                continue
+            rank = THREAT_ORDER.get(entry.get("threat_level", "Medium"), 2)
+            position = len(self._entries)
+            self._entries.append(entry)
+            buckets[rank].append(normalize_name(entry.get("name", "")))
+            buckets[rank].append(entry.get("id", "").lower())
+            owners[rank].append(position)
+            owners[rank].append(position)
+
+        self._keys: List[List[str]] = []
+        self._positions: List[List[int]] = []
+        for keys, positions in zip(buckets, owners):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys.append([keys[i] for i in order])
+            self._positions.append([positions[i] for i in order])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def full_ranges(self) -> List[Tuple[int, int]]:
+        """Return per-bucket ranges covering every key (the empty prefix)."""
+        return [(0, len(keys)) for keys in self._keys]
+
+    def narrow(self, prefix: str, ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Restrict per-bucket ranges to keys starting with a prefix.
+
+        Args:
+            prefix: Normalized prefix
+            ranges: Ranges to search within, e.g. those of a shorter prefix
+
+        Returns:
+            The narrowed per-bucket ranges
+        """
+        narrowed = []
+        for keys, (lo, hi) in zip(self._keys, ranges):
+            start = bisect_left(keys, prefix, lo, hi)
+            end = bisect_left(keys, prefix + _PREFIX_END, start, hi)
+            narrowed.append((start, end))
+        return narrowed
+
+    def top(self, ranges: List[Tuple[int, int]], k: int) -> List[Dict]:
+        """Return up to k distinct entries from the ranges, most severe first."""
+        results = []
+        seen = set()
+        for positions, (lo, hi) in zip(self._positions, ranges):
+            for i in range(lo, hi):
+                position = positions[i]
+                if position in seen:
+                    continue
+                seen.add(position)
+                results.append(self._entries[position])
+                if len(results) >= k:
+                    return results
+        return results
+
+
+class LiveSearch:
+    """
+    Incremental search-as-you-type session over a BlacklistManager.
+
+    Remembers the ranges of the previous query so that typing more
+    characters only searches within the previous results.
+
+    In background mode the index is never built on the caller's thread:
+    when the entries change, suggestions keep coming from the previous
+    index while a worker thread rebuilds it, and on_ready is called once
+    the new index is in place so the caller can re-run the current query.
+    """
+
+    def __init__(self, manager: BlacklistManager, limit: int = 8, background: bool = False,
+                 on_ready: Optional[Callable[[], None]] = None):
+        """
+        Initialize the LiveSearch.
+
+        Args:
+            manager: BlacklistManager providing the entries
+            limit: Number of suggestions to return
+            background: Build and rebuild the index on a worker thread (safe,
+                since the manager's entry snapshots are immutable)
+            on_ready: Called from the worker thread after a background build
+        """
+        self.manager = manager
+        self.limit = limit
+        self.background = background
+        self.on_ready = on_ready
+        self._index: Tuple[Optional[int], Optional[PrefixSearchIndex]] = (None, None)
+        self._last: Tuple[Optional[PrefixSearchIndex], str, Optional[List[Tuple[int, int]]]] = (None, "", None)
+        self._building = threading.Lock()
+
+    def _build_index(self) -> PrefixSearchIndex:
+        """Build an index of the current entries and publish it."""
+        self.manager.expire_due()
+        # Read the revision before the entries so a racing write only causes a rebuild
+        revision = self.manager.revision
+        index = PrefixSearchIndex(self.manager.blacklist["entries"])
+        self._index = (revision, index)
+        return index
+
+    def _start_background_build(self):
+        """Start a worker thread rebuilding the index unless one is running."""
+        if not self._building.acquire(blocking=False):
+            return
+        threading.Thread(target=self._build_in_background, daemon=True).start()
+
+    def _build_in_background(self):
+        """Worker thread body: build the index, then notify the caller."""
+        try:
+            self._build_index()
+        finally:
+            self._building.release()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def _current_index(self) -> Optional[PrefixSearchIndex]:
+        """
+        Return the index to answer from, rebuilding it if entries changed.
+
+        In background mode a stale index is returned as is (None before the
+        first build completes) while the rebuild runs.
+        """
+        if not self.background:
+            self.manager.expire_due()
+        revision, index = self._index
+        if index is not None and revision == self.manager.revision:
+            return index
+        if self.background:
+            self._start_background_build()
+            return index
+        return self._build_index()
+
+    def prepare(self, background: Optional[bool] = None):
+        """
+        Build the index ahead of the first keystroke.
+
+        Args:
+            background: Build on a worker thread so a UI is never blocked
+                (default: the mode given to the constructor)
+        """
+        revision, index = self._index
+        if index is not None and revision == self.manager.revision:
+            return
+        if self.background if background is None else background:
+            self._start_background_build()
+        else:
+            self._build_index()
+
+    def suggest(self, query: str) -> List[Dict]:
+        """
+        Return the top suggestions for a (partial) query.
+
+        Args:
+            query: Text typed so far; matched as a prefix of names and IDs
+
+        Returns:
+            Up to `limit` entries ranked by threat level (none while the
+            first background build is still running)
+        """
+        index = self._current_index()
+        query = normalize_name(query)
+        if index is None or not query:
+            self._last = (None, "", None)
+            return []
+
+        last_index, last_query, last_ranges = self._last
+        if last_index is index and query.startswith(last_query):
+            ranges = last_ranges
+        else:
+            ranges = index.full_ranges()
+        ranges = index.narrow(query, ranges)
+
+        self._last = (index, query, ranges)
+        return index.top(ranges, self.limit)
@@ -0,0 +1,191 @@
+"""
+Network Entry Index
+Longest-prefix-match radix tries for IP/CIDR entries and a reversed-label trie for domains.
+"""
+import ipaddress
+from typing import Dict, Iterable, List, Optional
+
+
+ENTRY_TYPES = ("ip", "cidr", "domain", "wildcard_domain")
+
+
+def normalize_network_value(entry_type: str, value: str) -> str:
+    """
+    Validate and normalize the value of a typed entry.
+
+    Args:
+        entry_type: One of ENTRY_TYPES
+        value: Raw IP address, CIDR range or domain
+
+    Returns:
+        The canonical form of the value
+
+    Raises:
+        ValueError: If the type is unknown or the value is malformed
+    """
+    value = value.strip()
+    if entry_type == "ip":
+        return str(ipaddress.ip_address(value))
+    if entry_type == "cidr":
+        return str(ipaddress.ip_network(value, strict=False))
+    if entry_type == "domain":
+        return _normalize_domain(value)
+    if entry_type == "wildcard_domain":
+        if not value.startswith("*."):
+            raise ValueError(f"Wildcard domain must start with '*.': {value}")
+        return "*." + _normalize_domain(value[2:])
+    raise ValueError(f"Unknown entry type: {entry_type}")
+
+
+def _normalize_domain(domain: str) -> str:
+    """Lowercase a domain and strip the trailing root dot."""
+    domain = domain.strip().lower().rstrip(".")
+    if not domain or any(not label for label in domain.split(".")):
+        raise ValueError(f"Invalid domain: {domain}")
+    return domain
+
+
+class IPRadixTrie:
+    """
+    Binary radix trie over address bits supporting longest-prefix match.
+
+    Each node is a list of [zero child, one child, entries].
+    """
+
+    def __init__(self, max_bits: int):
+        """
+        Initialize the trie.
+
+        Args:
+            max_bits: Address width (32 for IPv4, 128 for IPv6)
+        """
+        self.max_bits = max_bits
+        self._root = [None, None, None]
+
+    def insert(self, network: int, prefix_len: int, entry: Dict):
+        """Insert an entry for the network with the given prefix length."""
+        node = self._root
+        shift = self.max_bits - 1
+        for _ in range(prefix_len):
+            bit = (network >> shift) & 1
+            child = node[bit]
+            if child is None:
+                child = node[bit] = [None, None, None]
+            node = child
+            shift -= 1
+        if node[2] is None:
+            node[2] = []
+        node[2].append(entry)
+
+    def longest_match(self, address: int) -> Optional[List[Dict]]:
+        """Return the entries of the most specific prefix covering the address."""
+        node = self._root
+        best = node[2]
+        shift = self.max_bits - 1
+        while shift >= 0:
+            node = node[(address >> shift) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+            shift -= 1
+        return best
+
+
+class DomainTrie:
+    """
+    Trie keyed on reversed domain labels (com -> example -> www).
+
+    Each node is a dict with "children", "exact" and "wildcard" keys.
+    """
+
+    def __init__(self):
+        """Initialize an empty trie."""
+        self._root = {"children": {}, "exact": None, "wildcard": None}
+
+    def insert(self, domain: str, entry: Dict, wildcard: bool = False):
+        """Insert an entry for a domain, or for its subdomains when wildcard."""
+        node = self._root
+        for label in reversed(domain.split(".")):
+            child = node["children"].get(label)
+            if child is None:
+                child = node["children"][label] = {"children": {}, "exact": None, "wildcard": None}
+            node = child
+        key = "wildcard" if wildcard else "exact"
+        if node[key] is None:
+            node[key] = []
+        node[key].append(entry)
+
+    def longest_match(self, domain: str) -> Optional[List[Dict]]:
+        """Return the entries of the most specific rule covering the domain."""
+        labels = domain.split(".")
+        node = self._root
+        best = None
+        for depth, label in enumerate(reversed(labels), 1):
+            node = node["children"].get(label)
+            if node is None:
+                return best
+            if depth == len(labels):
+                return node["exact"] or best
+            # A wildcard only covers names strictly below its own level
+            if node["wildcard"] is not None:
+                best = node["wildcard"]
+        return best
+
+
+class NetworkIndex:
+    """Index of typed network entries built from a list of entries."""
+
+    def __init__(self, entries: Iterable[Dict]):
+        """
+        Build the index.
+
+        Args:
+            entries: Blacklist entries; only active typed entries are indexed.
+                Entries whose value is missing or malformed (e.g. from a
+                hand-edited data file) are skipped and never match.
+        """
+        self._ipv4 = IPRadixTrie(32)
+        self._ipv6 = IPRadixTrie(128)
+        self._domains = DomainTrie()
+
+        for entry in entries:
+            if entry.get("status", "active") != "active":
+                continue
+            entry_type = entry.get("entry_type")
+            if entry_type not in ENTRY_TYPES:
+                continue
+            value = entry.get("value")
+            if not isinstance(value, str):
+                continue
+            try:
+                value = normalize_network_value(entry_type, value)
+            except ValueError:
+                continue
+            if entry_type in ("ip", "cidr"):
+                network = ipaddress.ip_network(value, strict=False)
+                trie = self._ipv4 if network.version == 4 else self._ipv6
+                trie.insert(int(network.network_address), network.prefixlen, entry)
+            elif entry_type == "domain":
+                self._domains.insert(value, entry)
+            elif entry_type == "wildcard_domain":
+                self._domains.insert(value[2:], entry, wildcard=True)
+
+    def match_ip(self, address: str) -> Optional[Dict]:
+        """Return the most specific entry covering the address, or None."""
+        try:
+            ip = ipaddress.ip_address(address.strip())
+        except ValueError:
+            return None
+        trie = self._ipv4 if ip.version == 4 else self._ipv6
+        matches = trie.longest_match(int(ip))
+        return matches[0] if matches else None
+
+    def match_domain(self, domain: str) -> Optional[Dict]:
+        """Return the most specific entry covering the domain, or None."""
+        try:
+            domain = _normalize_domain(domain)
+        except ValueError:
+            return None
+        matches = self._domains.longest_match(domain)
+        return matches[0] if matches else None
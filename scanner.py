@@ -0,0 +1,280 @@
+"""
+Multi-pattern Text Scanner
+Finds blacklisted names inside documents and streams with an Aho-Corasick automaton.
+"""
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from blacklist import BlacklistManager
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _fold_char(ch: str) -> str:
+    """Lowercase a single character without changing its length."""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+def _fold_text(text: str) -> str:
+    """Lowercase text while keeping character offsets stable."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(_fold_char(ch) for ch in text)
+
+
+def normalize_name(name: str, case_insensitive: bool = True) -> str:
+    """
+    Normalize an entry name for matching.
+
+    Args:
+        name: Raw entry name
+        case_insensitive: Fold the name to lowercase
+
+    Returns:
+        The normalized name (same length as the stripped input)
+    """
+    name = name.strip()
+    if case_insensitive:
+        name = _fold_text(name)
+    return name
+
+
+def _is_word_char(ch: str) -> bool:
+    """Return True if the character is part of a word."""
+    return ch.isalnum() or ch == "_"
+
+
+class BlacklistScanner:
+    """
+    Scans text for any active blacklist entry name.
+
+    The automaton is built from the manager's active entries and rebuilt
+    lazily the next time a scan runs after the manager has been mutated.
+    Offsets are character offsets into the scanned text or stream.
+    """
+
+    def __init__(self, manager: BlacklistManager, case_insensitive: bool = True,
+                 whole_words: bool = True):
+        """
+        Initialize the BlacklistScanner.
+
+        Args:
+            manager: BlacklistManager providing the entries
+            case_insensitive: Match names regardless of case
+            whole_words: Only report matches bounded by non-word characters
+        """
+        self.manager = manager
+        self.case_insensitive = case_insensitive
+        self.whole_words = whole_words
+        self._built_revision = None
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[tuple] = [()]
+        self._patterns: List[Dict] = []
+        self._max_length = 0
+
+    def _ensure_built(self):
+        """Rebuild the automaton if the manager changed since the last build."""
+        self.manager.expire_due()
+        if self._built_revision != self.manager.revision:
+            self.rebuild()
+
+    def rebuild(self):
+        """Build the Aho-Corasick automaton from the active entries."""
+        revision = self.manager.revision
+        by_pattern: Dict[str, List[str]] = {}
+        for entry in self.manager.blacklist["entries"]:
+            if entry.get("status", "active") != "active":
+                continue
+            pattern = normalize_name(entry.get("name", ""), self.case_insensitive)
+            if pattern:
+                by_pattern.setdefault(pattern, []).append(entry.get("id"))
+
+        goto: List[Dict[str, int]] = [{}]
+        own_output: List[List[int]] = [[]]
+        patterns = []
+
+        for pattern, entry_ids in by_pattern.items():
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    own_output.append([])
+                state = nxt
+            own_output[state].append(len(patterns))
+            patterns.append({"pattern": pattern, "length": len(pattern), "entry_ids": entry_ids})
+
+        # Breadth-first pass to compute failure links and merged outputs
+        fail = [0] * len(goto)
+        output: List[tuple] = [()] * len(goto)
+        queue = []
+        for state in goto[0].values():
+            output[state] = tuple(own_output[state])
+            queue.append(state)
+
+        head = 0
+        while head < len(queue):
+            current = queue[head]
+            head += 1
+            for ch, nxt in goto[current].items():
+                state = fail[current]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fallback = goto[state].get(ch, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                output[nxt] = tuple(own_output[nxt]) + output[fail[nxt]]
+                queue.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self._patterns = patterns
+        self._max_length = max((p["length"] for p in patterns), default=0)
+        self._built_revision = revision
+
+    def scan_text(self, text: str) -> List[Dict]:
+        """
+        Scan a complete string.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of matches with entry_id, name, start and end offsets
+        """
+        return list(self.scan_stream([text]))
+
+    def scan_stream(self, chunks: Iterable[str]) -> Iterator[Dict]:
+        """
+        Scan text delivered as a sequence of chunks.
+
+        Matches spanning chunk boundaries are reported, and memory use is
+        bounded by the chunk size plus the longest pattern.
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            Match dictionaries with entry_id, name, start and end offsets
+        """
+        self._ensure_built()
+        if not self._patterns:
+            for _ in chunks:
+                pass
+            return
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self._patterns
+        fold = self.case_insensitive
+        whole_words = self.whole_words
+        keep = self._max_length
+
+        state = 0
+        offset = 0          # stream offset of the current chunk
+        tail = ""           # last `keep` characters preceding the current chunk
+        pending = []        # matches ending at a chunk boundary, awaiting the next char
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            if pending:
+                boundary = not _is_word_char(chunk[0])
+                for match in pending:
+                    if boundary:
+                        yield match
+                pending = []
+
+            window = tail + chunk
+            base = offset - len(tail)
+            last = len(chunk) - 1
+
+            for i, ch in enumerate(_fold_text(chunk) if fold else chunk):
+                nxt = goto[state].get(ch)
+                while nxt is None and state:
+                    state = fail[state]
+                    nxt = goto[state].get(ch)
+                state = nxt if nxt is not None else 0
+                hits = output[state]
+                if not hits:
+                    continue
+
+                end = offset + i + 1
+                for index in hits:
+                    pattern = patterns[index]
+                    start = end - pattern["length"]
+                    if whole_words:
+                        before = start - base - 1
+                        if before >= 0 and _is_word_char(window[before]):
+                            continue
+                    deferred = whole_words and i == last
+                    if whole_words and not deferred and _is_word_char(chunk[i + 1]):
+                        continue
+                    for entry_id in pattern["entry_ids"]:
+                        match = {
+                            "entry_id": entry_id,
+                            "name": pattern["pattern"],
+                            "start": start,
+                            "end": end,
+                        }
+                        if deferred:
+                            pending.append(match)
+                        else:
+                            yield match
+
+            offset += len(chunk)
+            tail = window[-keep:] if keep else ""
+
+        # End of stream counts as a word boundary
+        for match in pending:
+            yield match
+
+    def scan_file(self, source: Union[str, TextIO],
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+        """
+        Scan a file or stdin in streaming chunks.
+
+        Args:
+            source: Path, "-" for stdin, or an open text file
+            chunk_size: Number of characters to read per chunk
+
+        Yields:
+            Match dictionaries with entry_id, name, start and end offsets
+        """
+        if source == "-":
+            yield from self.scan_stream(_read_chunks(sys.stdin, chunk_size))
+        elif isinstance(source, str):
+            with open(source, 'r', encoding='utf-8', errors='replace') as f:
+                yield from self.scan_stream(_read_chunks(f, chunk_size))
+        else:
+            yield from self.scan_stream(_read_chunks(source, chunk_size))
+
+
+def _read_chunks(f: TextIO, chunk_size: int) -> Iterator[str]:
+    """Yield fixed-size chunks from an open text file."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def main(argv: Optional[List[str]] = None):
+    """Scan files (or stdin) given on the command line and print matches."""
+    args = sys.argv[1:] if argv is None else argv
+    scanner = BlacklistScanner(BlacklistManager())
+    for source in args or ["-"]:
+        for match in scanner.scan_file(source):
+            print(f"{source}:{match['start']}-{match['end']}\t{match['entry_id']}\t{match['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+At-Rest Storage Encodings
+Selectable JSON layouts and compression for the blacklist data file, detected automatically on load.
+"""
+import gzip
+import json
+import lzma
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+LAYOUTS = ("pretty", "compact", "columnar")
+COMPRESSIONS = ("gzip", "lzma")
+DEFAULT_FORMAT = "pretty"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+_COLUMNAR_TAG = "columnar"
+
+
+def parse_format(storage_format: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a storage format name into layout and compression.
+
+    Args:
+        storage_format: Layout optionally followed by "+gzip" or "+lzma",
+            e.g. "pretty", "compact+gzip", "columnar+lzma"
+
+    Returns:
+        (layout, compression or None)
+
+    Raises:
+        ValueError: If the layout or compression is unknown
+    """
+    layout, _, compression = storage_format.partition("+")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown storage layout: {layout} (choose from {', '.join(LAYOUTS)})")
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression} (choose from {', '.join(COMPRESSIONS)})")
+    return layout, compression or None
+
+
+def format_name(layout: str, compression: Optional[str]) -> str:
+    """Join a layout and compression into a storage format name."""
+    return f"{layout}+{compression}" if compression else layout
+
+
+def _to_columnar(data: Dict) -> Dict:
+    """Convert entries to a field dictionary with one value list per field."""
+    entries = data.get("entries", [])
+    fields: List[str] = []
+    seen = set()
+    for entry in entries:
+        for field in entry:
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+
+    columns = {}
+    sparse = {}
+    for field in fields:
+        values = [entry.get(field) for entry in entries]
+        present = sum(1 for entry in entries if field in entry)
+        if present == len(entries):
+            columns[field] = values
+        else:
+            # Optional fields (expires_at, entry_type, ...) are mostly absent
+            sparse[field] = {str(i): entry[field] for i, entry in enumerate(entries) if field in entry}
+
+    layout = {key: value for key, value in data.items() if key != "entries"}
+    layout["format"] = _COLUMNAR_TAG
+    layout["count"] = len(entries)
+    layout["columns"] = columns
+    layout["sparse"] = sparse
+    return layout
+
+
+def _from_columnar(layout: Dict) -> Dict:
+    """Rebuild row entries from the columnar layout."""
+    columns = layout["columns"]
+    fields = list(columns)
+    if fields:
+        entries = [dict(zip(fields, row)) for row in zip(*(columns[field] for field in fields))]
+    else:
+        entries = [{} for _ in range(layout.get("count", 0))]
+    for field, values in layout.get("sparse", {}).items():
+        for index, value in values.items():
+            entries[int(index)][field] = value
+
+    data = {key: value for key, value in layout.items()
+            if key not in ("format", "count", "columns", "sparse")}
+    data["entries"] = entries
+    return data
+
+
+def encode(data: Dict, storage_format: str = DEFAULT_FORMAT) -> bytes:
+    """
+    Serialize blacklist data.
+
+    Args:
+        data: Blacklist data ({"entries": [...], "metadata": {...}})
+        storage_format: Storage format name (see parse_format)
+
+    Returns:
+        The encoded bytes
+    """
+    layout, compression = parse_format(storage_format)
+    if layout == "pretty":
+        raw = json.dumps(data, indent=2).encode("utf-8")
+    elif layout == "compact":
+        raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    else:
+        raw = json.dumps(_to_columnar(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    if compression == "gzip":
+        return gzip.compress(raw, compresslevel=6)
+    if compression == "lzma":
+        return lzma.compress(raw, preset=6)
+    return raw
+
+
+def decode(raw: bytes) -> Tuple[Dict, str]:
+    """
+    Deserialize blacklist data in any supported format.
+
+    Args:
+        raw: Encoded bytes
+
+    Returns:
+        (data, detected storage format name)
+
+    Raises:
+        ValueError: If the bytes are not a valid encoding
+    """
+    compression = None
+    try:
+        if raw.startswith(_GZIP_MAGIC):
+            compression = "gzip"
+            raw = gzip.decompress(raw)
+        elif raw.startswith(_XZ_MAGIC):
+            compression = "lzma"
+            raw = lzma.decompress(raw)
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        raise ValueError(f"Corrupt {compression} data: {e}") from e
+
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("Blacklist data must be a JSON object")
+    if data.get("format") == _COLUMNAR_TAG:
+        return _from_columnar(data), format_name("columnar", compression)
+
+    # Indented output always opens the object on its own line
+    layout = "pretty" if raw.startswith(b"{\n") else "compact"
+    return data, format_name(layout, compression)
+
+
+def read_file(path: str) -> Tuple[Dict, str]:
+    """Read and decode a data file, returning (data, detected storage format)."""
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+def write_file(path: str, data: Dict, storage_format: str = DEFAULT_FORMAT):
+    """
+    Encode data and atomically replace a file with it.
+
+    The bytes go to a temporary file that is renamed over the target, so an
+    interrupted save leaves the previous file intact rather than truncated.
+    """
+    payload = encode(data, storage_format)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,193 @@
+"""
+Concurrency Stress Tests
+Readers, writers and lazy expiry hammering one shared BlacklistManager.
+Run with: python -m unittest test_concurrency
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from blacklist import BlacklistManager
+
+
+STRESS_SECONDS = 1.0
+INITIAL_ENTRIES = 500
+
+
+def _run_threads(targets, duration: float = STRESS_SECONDS) -> list:
+    """Run targets(stop, errors) on threads for a while and return any errors."""
+    stop = threading.Event()
+    errors = []
+
+    def guard(target):
+        try:
+            target(stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=guard, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class ConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self._tmp.name, "blacklist.json")
+        self.manager = BlacklistManager(self.data_file, write_back=True, flush_delay=0.05)
+        self.manager.add_entries([{"name": f"seed {i}", "reason": "seed", "threat_level": "Low"}
+                                  for i in range(INITIAL_ENTRIES)])
+
+    def tearDown(self):
+        self.manager.close()
+        self._tmp.cleanup()
+
+    def test_readers_see_consistent_snapshots(self):
+        manager = self.manager
+
+        def writer(stop):
+            while not stop.is_set():
+                entry = manager.add_entry("transient", "stress", "High")
+                manager.update_entry(entry["id"], notes="updated", threat_level="Critical")
+                manager.remove_entry(entry["id"])
+
+        def reader(stop):
+            while not stop.is_set():
+                snapshot = manager.blacklist["entries"]
+                ids = [entry["id"] for entry in snapshot]
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertIn(len(ids), (INITIAL_ENTRIES, INITIAL_ENTRIES + 1))
+                manager.search_entries("seed")
+                manager.check_names(["seed 1", "transient"])
+                manager.top_entries(5)
+
+        errors = _run_threads([writer] + [reader] * 4)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(manager.blacklist["entries"]), INITIAL_ENTRIES)
+
+    def test_concurrent_writers_lose_nothing(self):
+        manager = self.manager
+        added = []
+
+        def writer(stop):
+            while not stop.is_set():
+                added.append(manager.add_entry("concurrent", "stress")["id"])
+
+        errors = _run_threads([writer] * 4)
+        self.assertEqual(errors, [])
+        ids = [entry["id"] for entry in manager.blacklist["entries"]]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), INITIAL_ENTRIES + len(added))
+
+        manager.close()
+        reloaded = BlacklistManager(self.data_file)
+        self.assertEqual(reloaded.blacklist["entries"], manager.blacklist["entries"])
+
+    def test_lazy_expiry_races_writers(self):
+        manager = self.manager
+
+        def writer(stop):
+            rng = random.Random()
+            while not stop.is_set():
+                soon = datetime.now() + timedelta(milliseconds=rng.randint(0, 3))
+                entry = manager.add_entry("short lived", "stress", expires_at=soon)
+                choice = rng.random()
+                if choice < 0.3:
+                    manager.remove_entry(entry["id"])
+                elif choice < 0.6:
+                    # Re-arm far ahead: the stale heap item must not expire it
+                    manager.update_entry(entry["id"], expires_at=datetime.now() + timedelta(hours=1))
+
+        def reader(stop):
+            while not stop.is_set():
+                manager.expire_due()
+                now = time.time()
+                for entry in manager.search_entries("short lived", include_expired=True):
+                    if entry["status"] == "expired":
+                        self.assertLessEqual(datetime.fromisoformat(entry["expires_at"]).timestamp(), now)
+
+        errors = _run_threads([writer, writer] + [reader] * 4)
+        self.assertEqual(errors, [])
+
+        time.sleep(0.01)
+        # expire_due only try-locks; holding the (reentrant) lock keeps the
+        # write-back flusher from making this final sweep a no-op
+        with manager._lock:
+            manager.expire_due()
+        now = time.time()
+        entries = manager.search_entries("short lived", include_expired=True)
+        self.assertTrue(entries)
+        for entry in entries:
+            overdue = datetime.fromisoformat(entry["expires_at"]).timestamp() <= now
+            self.assertEqual(entry["status"], "expired" if overdue else "active")
+
+    def test_version_history_reads_race_writers(self):
+        manager = BlacklistManager(os.path.join(self._tmp.name, "versioned.json"),
+                                   write_back=True, versioning=True, history_limit=10 ** 6)
+
+        def writer(stop):
+            while not stop.is_set():
+                entry = manager.add_entry("versioned", "stress")
+                manager.remove_entry(entry["id"])
+
+        def reader(stop):
+            while not stop.is_set():
+                versions = manager.list_versions()
+                self.assertEqual([v["version"] for v in versions], list(range(len(versions))))
+                manager.diff(versions[-1]["version"] // 2)
+
+        errors = _run_threads([writer] + [reader] * 3)
+        manager.close()
+        self.assertEqual(errors, [])
+
+    def test_mutation_racing_close_is_saved(self):
+        data_file = os.path.join(self._tmp.name, "close.json")
+        # A long delay keeps the background flusher out of the way
+        manager = BlacklistManager(data_file, write_back=True, flush_delay=60)
+        manager.add_entry("pending", "stress")
+        racers = []
+        unpatched_flush = manager.flush
+
+        closer = threading.current_thread()
+
+        def flush_then_race():
+            unpatched_flush()
+            if threading.current_thread() is not closer:
+                return
+            # Mutate from another thread between close()'s flush and _closed
+            racer = threading.Thread(target=manager.add_entry, args=("racer", "stress"))
+            racer.start()
+            racer.join(0.2)
+            racers.append(racer)
+
+        manager.flush = flush_then_race
+        manager.close()
+        del manager.flush
+        for racer in racers:
+            racer.join()
+        reloaded = BlacklistManager(data_file)
+        self.assertEqual(reloaded.blacklist["entries"], manager.blacklist["entries"])
+        self.assertEqual(len(reloaded.blacklist["entries"]), 2)
+
+    def test_expire_due_when_heap_empties_concurrently(self):
+        class VanishingHeap(list):
+            # Looks non-empty, as if a writer popped the last item just after the check
+            def __bool__(self):
+                return True
+
+        self.manager._expiry_heap = VanishingHeap()
+        self.assertEqual(self.manager.expire_due(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
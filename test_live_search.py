@@ -0,0 +1,73 @@
+"""
+Live Search Tests
+Prefix suggestions and background index rebuilds.
+Run with: python -m unittest test_live_search
+"""
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+from blacklist import THREAT_ORDER, BlacklistManager
+from live_search import LiveSearch
+from scanner import normalize_name
+
+
+class LiveSearchTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manager = BlacklistManager(os.path.join(self._tmp.name, "blacklist.json"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_suggestions_match_brute_force_while_typing(self):
+        rng = random.Random(32)
+        levels = list(THREAT_ORDER)
+        self.manager.add_entries([
+            {"name": "".join(rng.choice("abc") for _ in range(rng.randint(1, 6))),
+             "reason": "test", "threat_level": rng.choice(levels)}
+            for _ in range(300)
+        ])
+        search = LiveSearch(self.manager, limit=5)
+
+        for _ in range(50):
+            word = "".join(rng.choice("abc") for _ in range(4))
+            for end in range(1, len(word) + 1):
+                query = word[:end]
+                matching = [e for e in self.manager.blacklist["entries"]
+                            if normalize_name(e["name"]).startswith(query)
+                            or e["id"].lower().startswith(query)]
+                best = sorted(THREAT_ORDER[e["threat_level"]] for e in matching)[:5]
+                results = search.suggest(query)
+                self.assertEqual(sorted(THREAT_ORDER[e["threat_level"]] for e in results), best)
+                for entry in results:
+                    self.assertTrue(normalize_name(entry["name"]).startswith(query)
+                                    or entry["id"].lower().startswith(query))
+
+    def test_background_rebuild_serves_previous_index(self):
+        ready = threading.Event()
+        self.manager.add_entry("alice", "test")
+        search = LiveSearch(self.manager, background=True, on_ready=ready.set)
+
+        self.assertEqual(search.suggest("al"), [])  # first build still pending
+        self.assertTrue(ready.wait(5))
+        self.assertEqual([e["name"] for e in search.suggest("al")], ["alice"])
+
+        ready.clear()
+        self.manager.add_entry("alfred", "test", threat_level="Critical")
+        # Answered from the stale index without waiting for the rebuild
+        self.assertEqual([e["name"] for e in search.suggest("al")], ["alice"])
+        self.assertTrue(ready.wait(5))
+        self.assertEqual([e["name"] for e in search.suggest("al")], ["alfred", "alice"])
+
+    def test_synchronous_mode_rebuilds_immediately(self):
+        search = LiveSearch(self.manager)
+        self.assertEqual(search.suggest("bo"), [])
+        self.manager.add_entry("bob", "test")
+        self.assertEqual([e["name"] for e in search.suggest("bo")], ["bob"])
+
+
+if __name__ == "__main__":
+    unittest.main()
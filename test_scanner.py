@@ -0,0 +1,97 @@
+"""
+Scanner Tests
+Streaming Aho-Corasick matches checked against a brute-force search.
+Run with: python -m unittest test_scanner
+"""
+import os
+import random
+import tempfile
+import unittest
+
+from blacklist import BlacklistManager
+from scanner import BlacklistScanner, _is_word_char, normalize_name
+
+
+ROUNDS = 200
+
+
+def _brute_force(entries, text: str, case_insensitive: bool, whole_words: bool) -> list:
+    """Find every (entry_id, start, end) occurrence with plain substring search."""
+    haystack = text.lower() if case_insensitive else text
+    found = []
+    for entry in entries:
+        pattern = normalize_name(entry["name"], case_insensitive)
+        start = haystack.find(pattern)
+        while start != -1:
+            end = start + len(pattern)
+            if not whole_words or (
+                    (start == 0 or not _is_word_char(text[start - 1]))
+                    and (end == len(text) or not _is_word_char(text[end]))):
+                found.append((entry["id"], start, end))
+            start = haystack.find(pattern, start + 1)
+    return sorted(found)
+
+
+def _random_chunks(rng: random.Random, text: str) -> list:
+    """Split text at random points, including empty and single-character chunks."""
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.choice([0, 1, 1, 2, 3, 5, 8, 13])
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+class ScanStreamTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manager = BlacklistManager(os.path.join(self._tmp.name, "blacklist.json"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_matches_brute_force_across_random_chunks(self):
+        rng = random.Random(26)
+        # A tiny alphabet makes overlapping, nested and boundary-straddling matches common
+        alphabet = "aAbB _-"
+        names = {"".join(rng.choice("abAB") for _ in range(rng.randint(1, 4))) for _ in range(12)}
+        names |= {"ab ba", "a-b"}
+        entries = self.manager.add_entries([{"name": name, "reason": "test"} for name in names])
+
+        for case_insensitive in (True, False):
+            for whole_words in (True, False):
+                scanner = BlacklistScanner(self.manager, case_insensitive, whole_words)
+                for _ in range(ROUNDS):
+                    text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+                    expected = _brute_force(entries, text, case_insensitive, whole_words)
+                    actual = sorted((m["entry_id"], m["start"], m["end"])
+                                    for m in scanner.scan_stream(_random_chunks(rng, text)))
+                    self.assertEqual(actual, expected,
+                                     f"text={text!r} case_insensitive={case_insensitive} "
+                                     f"whole_words={whole_words}")
+
+    def test_word_boundary_deferred_to_next_chunk(self):
+        entry = self.manager.add_entry("mallory", "test")
+        scanner = BlacklistScanner(self.manager)
+        self.assertEqual(list(scanner.scan_stream(["hi mallory", "n"])), [])
+        self.assertEqual([m["start"] for m in scanner.scan_stream(["hi mallory", " there"])], [3])
+        self.assertEqual([m["entry_id"] for m in scanner.scan_stream(["hi mal", "lory"])], [entry["id"]])
+
+    def test_duplicate_names_report_every_entry(self):
+        first = self.manager.add_entry("Eve", "test")
+        second = self.manager.add_entry("eve", "test")
+        matches = BlacklistScanner(self.manager).scan_text("EVE")
+        self.assertEqual(sorted(m["entry_id"] for m in matches), [first["id"], second["id"]])
+
+    def test_rebuilds_after_manager_changes(self):
+        scanner = BlacklistScanner(self.manager)
+        self.assertEqual(scanner.scan_text("trudy"), [])
+        entry = self.manager.add_entry("trudy", "test")
+        self.assertEqual(len(scanner.scan_text("trudy")), 1)
+        self.manager.remove_entry(entry["id"])
+        self.assertEqual(scanner.scan_text("trudy"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Storage Tests
+Round-trips and format detection for every at-rest layout and compression.
+Run with: python -m unittest test_storage
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import storage
+from blacklist import BlacklistManager
+
+
+FORMATS = [storage.format_name(layout, compression)
+           for layout in storage.LAYOUTS
+           for compression in (None,) + storage.COMPRESSIONS]
+
+SAMPLE = {
+    "entries": [
+        {"id": "BL001", "name": "Mallory", "reason": "spam", "threat_level": "High",
+         "notes": "", "category": "Fraud", "status": "active"},
+        # Optional fields present on some entries only, plus non-ASCII text
+        {"id": "BL002", "name": "10.0.0.0/8", "reason": "scanner", "threat_level": "Low",
+         "notes": "Ünïcödé ✓", "category": "General", "status": "expired",
+         "entry_type": "cidr", "value": "10.0.0.0/8", "expires_at": "2024-01-01T00:00:00"},
+        {"id": "BL003", "name": "eve", "reason": "phishing", "threat_level": "Critical",
+         "notes": None, "category": "General", "status": "active",
+         "expires_at": "2099-01-01T00:00:00"},
+    ],
+    "metadata": {"version": "1.0"},
+}
+
+
+class StorageFormatTest(unittest.TestCase):
+    def test_round_trip_and_detection(self):
+        for storage_format in FORMATS:
+            with self.subTest(storage_format=storage_format):
+                data, detected = storage.decode(storage.encode(SAMPLE, storage_format))
+                self.assertEqual(data, SAMPLE)
+                self.assertEqual(detected, storage_format)
+
+    def test_empty_blacklist_round_trips(self):
+        empty = {"entries": [], "metadata": {"version": "1.0"}}
+        for storage_format in FORMATS:
+            with self.subTest(storage_format=storage_format):
+                self.assertEqual(storage.decode(storage.encode(empty, storage_format))[0], empty)
+
+    def test_legacy_pretty_file_is_detected(self):
+        raw = json.dumps(SAMPLE, indent=2).encode("utf-8")
+        self.assertEqual(storage.decode(raw), (SAMPLE, "pretty"))
+        self.assertEqual(storage.encode(SAMPLE, "pretty"), raw)
+
+    def test_smaller_formats_are_smaller(self):
+        sizes = {fmt: len(storage.encode(SAMPLE, fmt)) for fmt in ("pretty", "compact")}
+        self.assertLess(sizes["compact"], sizes["pretty"])
+
+    def test_invalid_input_raises_value_error(self):
+        gzipped = storage.encode(SAMPLE, "compact+gzip")
+        xz = storage.encode(SAMPLE, "compact+lzma")
+        for raw in (gzipped[:len(gzipped) // 2], xz[:len(xz) // 2],
+                    b"\x1f\x8bnot gzip", b"[1, 2]", b"{not json", b"\xff\xfe"):
+            with self.subTest(raw=raw[:12]):
+                with self.assertRaises(ValueError):
+                    storage.decode(raw)
+
+    def test_unknown_format_names_raise(self):
+        for name in ("yaml", "compact+zip", "columnar+gzip+lzma"):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    storage.parse_format(name)
+
+
+class StorageFileTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "blacklist.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_failed_write_keeps_previous_file(self):
+        storage.write_file(self.path, SAMPLE, "columnar+gzip")
+        with mock.patch("storage.os.replace", side_effect=OSError("interrupted")):
+            with self.assertRaises(OSError):
+                storage.write_file(self.path, {"entries": [], "metadata": {}}, "columnar+gzip")
+        self.assertEqual(storage.read_file(self.path), (SAMPLE, "columnar+gzip"))
+        self.assertEqual(os.listdir(self._tmp.name), ["blacklist.json"])
+
+    def test_manager_keeps_detected_format(self):
+        storage.write_file(self.path, SAMPLE, "columnar+lzma")
+        manager = BlacklistManager(self.path)
+        self.assertEqual(manager.storage_format, "columnar+lzma")
+        manager.add_entry("trudy", "test")
+        data, detected = storage.read_file(self.path)
+        self.assertEqual(detected, "columnar+lzma")
+        self.assertEqual(len(data["entries"]), 4)
+
+        manager.set_storage_format("compact")
+        self.assertEqual(storage.read_file(self.path), (manager.blacklist, "compact"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Versioning Tests
+PersistentMap fuzzed against a plain dict, the delta log, and manager history.
+Run with: python -m unittest test_versioning
+"""
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import versioning
+from blacklist import BlacklistManager
+from versioning import DeltaLog, PersistentMap
+
+
+OPERATIONS = 3000
+
+
+def _dict_diff(old: dict, new: dict) -> list:
+    """Reference implementation of PersistentMap.diff over plain dicts."""
+    changes = []
+    for key in old.keys() | new.keys():
+        if old.get(key) != new.get(key):
+            changes.append((key, old.get(key), new.get(key)))
+    return sorted(changes, key=lambda change: change[0])
+
+
+class PersistentMapTest(unittest.TestCase):
+    def _fuzz(self, seed: int):
+        rng = random.Random(seed)
+        keys = [f"BL{i:03d}" for i in range(300)]
+        current = PersistentMap()
+        expected = {}
+        snapshots = [(current, dict(expected))]
+
+        for step in range(OPERATIONS):
+            key = rng.choice(keys)
+            if rng.random() < 0.6:
+                value = {"id": key, "step": step}
+                current = current.assoc(key, value)
+                expected[key] = value
+            else:
+                current = current.dissoc(key)
+                expected.pop(key, None)
+            if step % 100 == 0:
+                snapshots.append((current, dict(expected)))
+        snapshots.append((current, dict(expected)))
+
+        for snapshot, reference in snapshots:
+            # Older versions are unaffected by later changes
+            self.assertEqual(len(snapshot), len(reference))
+            self.assertEqual(dict(snapshot.items()), reference)
+            for key in keys:
+                self.assertIs(snapshot.get(key), reference.get(key))
+
+        for _ in range(50):
+            (old, old_ref), (new, new_ref) = rng.sample(snapshots, 2)
+            self.assertEqual(sorted(old.diff(new), key=lambda change: change[0]),
+                             _dict_diff(old_ref, new_ref))
+
+        rebuilt = PersistentMap.from_items(expected.items())
+        self.assertEqual(dict(rebuilt.items()), expected)
+        self.assertEqual(rebuilt.diff(current), [])
+
+    def test_matches_dict(self):
+        self._fuzz(34)
+
+    def test_matches_dict_with_colliding_hashes(self):
+        # Four-bit hashes force many keys into shared leaves and full-depth paths
+        with mock.patch.object(versioning, "_hash", lambda key: hash(key) & 0xF):
+            self._fuzz(35)
+
+    def test_unchanged_assoc_and_missing_dissoc_return_same_map(self):
+        value = {"id": "BL001"}
+        base = PersistentMap().assoc("BL001", value)
+        self.assertIs(base.assoc("BL001", value), base)
+        self.assertIs(base.dissoc("BL999"), base)
+
+
+class DeltaLogTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "history")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_compaction_keeps_newest_records(self):
+        log = DeltaLog(self.path, limit=5)
+        for version in range(1, 13):
+            log.append([{"version": version}])
+        with open(self.path) as f:
+            self.assertLessEqual(sum(1 for _ in f), 10)
+        self.assertEqual([r["version"] for r in DeltaLog(self.path, limit=5).read()],
+                         [8, 9, 10, 11, 12])
+
+    def test_torn_final_line_is_ignored(self):
+        DeltaLog(self.path, limit=5).append([{"version": 1}, {"version": 2}])
+        with open(self.path, "a") as f:
+            f.write('{"version": 3, "chan')
+        self.assertEqual([r["version"] for r in DeltaLog(self.path, limit=5).read()], [1, 2])
+
+
+class ManagerHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self._tmp.name, "blacklist.json")
+        self.manager = BlacklistManager(self.data_file, versioning=True)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _state(self, manager=None):
+        return {e["id"]: e for e in (manager or self.manager).blacklist["entries"]}
+
+    def test_rollback_and_undo_restore_earlier_states(self):
+        manager = self.manager
+        states = {manager.current_version: self._state()}
+        alice = manager.add_entry("alice", "r")
+        states[manager.current_version] = self._state()
+        manager.add_entry("bob", "r", threat_level="High")
+        states[manager.current_version] = self._state()
+        manager.update_entry(alice["id"], notes="edited")
+        states[manager.current_version] = self._state()
+        manager.remove_entry("bob")
+        states[manager.current_version] = self._state()
+
+        manager.rollback(2)
+        self.assertEqual(self._state(), states[2])
+        self.assertEqual(manager.diff(2), [])
+
+        # Undo reverts the rollback, then keeps stepping back through the edits
+        manager.undo()
+        self.assertEqual(self._state(), states[4])
+        manager.undo()
+        self.assertEqual(self._state(), states[3])
+        manager.undo()
+        self.assertEqual(self._state(), states[2])
+
+    def test_undo_skips_automatic_expiry(self):
+        manager = self.manager
+        manager.add_entry("alice", "r")
+        manager.add_entry("mallory", "r", expires_at=datetime.now() + timedelta(milliseconds=20))
+        manager.update_entry("alice", notes="edited")
+        time.sleep(0.05)
+        self.assertEqual(len(manager.expire_due()), 1)
+
+        manager.undo()
+        alice = manager.get_entry("alice")
+        mallory = manager.get_entry("mallory")
+        self.assertEqual(alice["notes"], "")
+        # Restored past its expiry time, so it stays expired
+        self.assertEqual(mallory["status"], "expired")
+        self.assertEqual(manager.expire_due(), [])
+
+        manager.undo()
+        self.assertIsNone(manager.get_entry("mallory"))
+
+    def test_history_reloads_from_log(self):
+        manager = self.manager
+        manager.add_entry("alice", "r")
+        manager.snapshot("one entry")
+        manager.add_entry("bob", "r")
+        manager.update_entry("alice", threat_level="Critical")
+        manager.remove_entry("bob")
+        expected_versions = manager.list_versions()
+        expected_diffs = {v: manager.diff(v) for v in range(1, manager.current_version)}
+
+        reloaded = BlacklistManager(self.data_file, versioning=True)
+        # Version 0 predates the log, so only logged versions come back
+        self.assertEqual(reloaded.list_versions(), expected_versions[1:])
+        for version, changes in expected_diffs.items():
+            self.assertEqual(reloaded.diff(version), changes)
+
+        reloaded.rollback(2)
+        self.assertEqual([e["name"] for e in reloaded.blacklist["entries"]], ["alice"])
+        self.assertEqual(reloaded.get_entry("alice")["threat_level"], "Medium")
+
+    def test_log_is_not_ahead_of_a_failed_save(self):
+        manager = self.manager
+        manager.add_entry("alice", "r")
+        with mock.patch("storage.write_file", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manager.add_entry("bob", "r")
+        with open(self.data_file + ".history") as f:
+            logged = [json.loads(line)["version"] for line in f]
+        self.assertEqual(logged, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
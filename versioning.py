@@ -0,0 +1,424 @@
+"""
+Blacklist Versioning
+Persistent (structurally shared) entry maps, version history and an on-disk delta log.
+"""
+import gc
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+class _Leaf:
+    """Trie leaf holding the pairs whose keys share one hash (usually one pair)."""
+
+    __slots__ = ("hash", "items")
+
+    def __init__(self, key_hash: int, items: Tuple[Tuple[str, Dict], ...]):
+        self.hash = key_hash
+        self.items = items
+
+
+def _hash(key: str) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _assoc(node, shift: int, key_hash: int, key: str, value: Dict):
+    """Return (new node, added) with key set to value; untouched subtrees are shared."""
+    if node is None:
+        return _Leaf(key_hash, ((key, value),)), True
+
+    if isinstance(node, _Leaf):
+        if node.hash == key_hash:
+            for i, (existing, old) in enumerate(node.items):
+                if existing == key:
+                    if old is value:
+                        return node, False
+                    items = node.items[:i] + ((key, value),) + node.items[i + 1:]
+                    return _Leaf(key_hash, items), False
+            return _Leaf(key_hash, node.items + ((key, value),)), True
+        # Two different hashes in one slot: push the existing leaf one level down
+        children = [None] * _WIDTH
+        children[(node.hash >> shift) & _MASK] = node
+        return _assoc(tuple(children), shift, key_hash, key, value)
+
+    index = (key_hash >> shift) & _MASK
+    child, added = _assoc(node[index], shift + _BITS, key_hash, key, value)
+    if child is node[index]:
+        return node, added
+    return node[:index] + (child,) + node[index + 1:], added
+
+
+def _dissoc(node, shift: int, key_hash: int, key: str):
+    """Return (new node, removed) without key."""
+    if node is None:
+        return None, False
+
+    if isinstance(node, _Leaf):
+        if node.hash != key_hash:
+            return node, False
+        items = tuple(item for item in node.items if item[0] != key)
+        if len(items) == len(node.items):
+            return node, False
+        return (_Leaf(key_hash, items) if items else None), True
+
+    index = (key_hash >> shift) & _MASK
+    child, removed = _dissoc(node[index], shift + _BITS, key_hash, key)
+    if not removed:
+        return node, False
+    node = node[:index] + (child,) + node[index + 1:]
+    remaining = [c for c in node if c is not None]
+    if not remaining:
+        return None, True
+    if len(remaining) == 1 and isinstance(remaining[0], _Leaf):
+        return remaining[0], True
+    return node, True
+
+
+def _iter_items(node) -> Iterator[Tuple[str, Dict]]:
+    """Yield every (key, value) pair below a node."""
+    if node is None:
+        return
+    if isinstance(node, _Leaf):
+        yield from node.items
+        return
+    for child in node:
+        if child is not None:
+            yield from _iter_items(child)
+
+
+def _build(pairs: List[Tuple[int, str, Dict]], shift: int):
+    """Build a trie bottom-up from (hash, key, value) triples with unique keys."""
+    if len(pairs) == 1:
+        key_hash, key, value = pairs[0]
+        return _Leaf(key_hash, ((key, value),))
+    if shift >= 64:
+        return _Leaf(pairs[0][0], tuple((key, value) for _, key, value in pairs))
+    groups: Dict[int, List[Tuple[int, str, Dict]]] = {}
+    for pair in pairs:
+        index = (pair[0] >> shift) & _MASK
+        group = groups.get(index)
+        if group is None:
+            groups[index] = [pair]
+        else:
+            group.append(pair)
+    children = [None] * _WIDTH
+    for index, group in groups.items():
+        children[index] = _build(group, shift + _BITS)
+    return tuple(children)
+
+
+def _diff(old, new, out: List[Tuple[str, Optional[Dict], Optional[Dict]]]):
+    """Collect changed pairs, skipping subtrees shared by both versions."""
+    if old is new:
+        return
+    if isinstance(old, tuple) and isinstance(new, tuple):
+        for old_child, new_child in zip(old, new):
+            if old_child is not new_child:
+                _diff(old_child, new_child, out)
+        return
+
+    before = dict(_iter_items(old))
+    for key, value in _iter_items(new):
+        previous = before.pop(key, _MISSING)
+        if previous is _MISSING:
+            out.append((key, None, value))
+        elif previous is not value and previous != value:
+            out.append((key, previous, value))
+    for key, value in before.items():
+        out.append((key, value, None))
+
+
+class PersistentMap:
+    """
+    Immutable hash trie mapping entry IDs to entries.
+
+    assoc/dissoc return a new map that shares every untouched subtree with
+    the old one, so each change costs O(log32 n) new nodes rather than a copy.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root=None, size: int = 0):
+        self._root = root
+        self._size = size
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, Dict]]) -> "PersistentMap":
+        """Build a map in one pass; later duplicates of a key win."""
+        unique = dict(items)
+        if not unique:
+            return cls()
+        # The trie is acyclic, so pausing the cycle collector only saves
+        # it from rescanning the many new nodes during a large build
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            root = _build([(_hash(key), key, value) for key, value in unique.items()], 0)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return cls(root, len(unique))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, key: str, default=None):
+        """Return the value for key, or default."""
+        key_hash = _hash(key)
+        node = self._root
+        shift = 0
+        while node is not None:
+            if isinstance(node, _Leaf):
+                if node.hash == key_hash:
+                    for existing, value in node.items:
+                        if existing == key:
+                            return value
+                return default
+            node = node[(key_hash >> shift) & _MASK]
+            shift += _BITS
+        return default
+
+    def assoc(self, key: str, value: Dict) -> "PersistentMap":
+        """Return a new map with key set to value."""
+        root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._size + (1 if added else 0))
+
+    def dissoc(self, key: str) -> "PersistentMap":
+        """Return a new map without key."""
+        root, removed = _dissoc(self._root, 0, _hash(key), key)
+        if not removed:
+            return self
+        return PersistentMap(root, self._size - 1)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Iterate over (key, value) pairs in no particular order."""
+        return _iter_items(self._root)
+
+    def diff(self, other: "PersistentMap") -> List[Tuple[str, Optional[Dict], Optional[Dict]]]:
+        """
+        Compare with another map.
+
+        Returns:
+            (key, value in self or None, value in other or None) per changed key
+        """
+        out = []
+        _diff(self._root, other._root, out)
+        return out
+
+
+class DeltaLog:
+    """
+    Append-only NDJSON log with one record of entry changes per version.
+
+    Only the newest `limit` versions are retained: once the file holds
+    twice that many records it is rewritten with the newest `limit`.
+    """
+
+    def __init__(self, path: str, limit: int):
+        """
+        Initialize the DeltaLog.
+
+        Args:
+            path: Path of the log file
+            limit: Number of versions to retain
+        """
+        self.path = path
+        self.limit = limit
+        self._count = None
+
+    def read(self) -> List[Dict]:
+        """Read the retained records, oldest first."""
+        if not os.path.exists(self.path):
+            self._count = 0
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    break
+        self._count = len(records)
+        return records[-self.limit:]
+
+    def append(self, records: List[Dict]):
+        """Append records, compacting the file when it grows past the limit."""
+        if not records:
+            return
+        if self._count is None:
+            self.read()
+        with open(self.path, 'a') as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        self._count += len(records)
+        if self._count > 2 * self.limit:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log keeping only the newest `limit` records."""
+        records = self.read()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        os.replace(tmp_path, self.path)
+        self._count = len(records)
+
+
+class VersionStore:
+    """
+    Version history of the blacklist entries.
+
+    Every committed change set becomes a new version holding a
+    PersistentMap, so versions share structure and cost O(changes).
+    The newest `limit` versions are kept in memory and as deltas on disk.
+    """
+
+    def __init__(self, entries: List[Dict], log_path: str, limit: int = 100):
+        """
+        Initialize the VersionStore.
+
+        Args:
+            entries: Current entries (the state of the newest logged version)
+            log_path: Path of the on-disk delta log
+            limit: Number of versions to retain
+        """
+        self.limit = limit
+        self.current = PersistentMap.from_items((entry.get("id"), entry) for entry in entries)
+        self.version = 0
+        self._versions: "OrderedDict[int, Tuple[PersistentMap, str, str, bool]]" = OrderedDict()
+        self._pending: List[Dict] = []
+        self._undo = None
+        self._log = DeltaLog(log_path, limit)
+        self._load_history()
+
+    def _load_history(self):
+        """Rebuild retained versions by applying logged deltas in reverse."""
+        records = self._log.read()
+        if not records:
+            self._remember(self.version, self.current, datetime.now().isoformat(), "", False)
+            return
+
+        self.version = records[-1]["version"]
+        restored = []
+        state = self.current
+        for record in reversed(records):
+            restored.append((record["version"], state, record["timestamp"],
+                             record.get("label", ""), record.get("automatic", False)))
+            for change in record["changes"]:
+                if change["before"] is None:
+                    state = state.dissoc(change["id"])
+                else:
+                    state = state.assoc(change["id"], change["before"])
+        for version, state, timestamp, label, automatic in reversed(restored):
+            self._remember(version, state, timestamp, label, automatic)
+
+    def _remember(self, version: int, state: PersistentMap, timestamp: str, label: str,
+                  automatic: bool):
+        """Keep a version in memory, dropping the oldest beyond the limit."""
+        self._versions[version] = (state, timestamp, label, automatic)
+        while len(self._versions) > self.limit:
+            self._versions.popitem(last=False)
+
+    def commit(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]],
+               label: str = "", automatic: bool = False) -> int:
+        """
+        Record a new version.
+
+        Args:
+            changes: (old entry or None, new entry or None) pairs
+            label: Optional description of the version
+            automatic: The change was made by the system (e.g. lazy expiry)
+                rather than the user, so undo steps over it
+
+        Returns:
+            The new version number
+        """
+        state = self.current
+        delta = []
+        for old, new in changes:
+            if old is not None and (new is None or new.get("id") != old.get("id")):
+                state = state.dissoc(old.get("id"))
+                delta.append({"id": old.get("id"), "before": old, "after": None})
+                old = None
+            if new is not None:
+                state = state.assoc(new.get("id"), new)
+                delta.append({"id": new.get("id"), "before": old, "after": new})
+
+        self.version += 1
+        self.current = state
+        timestamp = datetime.now().isoformat()
+        self._remember(self.version, state, timestamp, label, automatic)
+        record = {"version": self.version, "timestamp": timestamp, "label": label, "changes": delta}
+        if automatic:
+            record["automatic"] = True
+        self._pending.append(record)
+        return self.version
+
+    def get(self, version: int) -> PersistentMap:
+        """
+        Return the entry map of a retained version.
+
+        Raises:
+            ValueError: If the version is unknown or no longer retained
+        """
+        try:
+            return self._versions[version][0]
+        except KeyError:
+            raise ValueError(f"Version {version} is not available") from None
+
+    def has(self, version: int) -> bool:
+        """Return True if the version is retained."""
+        return version in self._versions
+
+    def diff(self, v1: int, v2: int) -> List[Dict]:
+        """Return the entry changes from version v1 to version v2."""
+        return [{"id": key, "before": before, "after": after}
+                for key, before, after in self.get(v1).diff(self.get(v2))]
+
+    def _last_manual(self, version: int) -> int:
+        """Return the newest version up to `version` that is not an automatic change."""
+        while version in self._versions and self._versions[version][3]:
+            version -= 1
+        return version
+
+    def undo_target(self) -> int:
+        """
+        Return the version an undo should restore.
+
+        Undo reverts the newest user change, stepping over automatic ones,
+        and repeated undos keep stepping back from the version last restored.
+        """
+        start = self.version
+        if self._undo is not None and self._undo[0] == self._last_manual(self.version):
+            start = self._undo[1]
+        return self._last_manual(start) - 1
+
+    def mark_undo(self, restored: int):
+        """Remember that the current version was created by undoing to `restored`."""
+        self._undo = (self.version, restored)
+
+    def list_versions(self) -> List[Dict]:
+        """Describe the retained versions, oldest first."""
+        return [{"version": version, "timestamp": timestamp, "label": label,
+                 "automatic": automatic, "entries": len(state)}
+                for version, (state, timestamp, label, automatic) in self._versions.items()]
+
+    def flush_log(self):
+        """Write pending version deltas to the on-disk log."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self._log.append(pending)